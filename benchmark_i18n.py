@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import glob
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from check_translation_usage import SRC_DIR, extract_usages
+from locale_store import LocaleStore, flatten, save_json
+
+# Ancienne implémentation (sept passes re.findall), conservée uniquement
+# comme point de comparaison
+LEGACY_USAGE_PATTERNS = [
+    r't\([\'"]([^\'"]+)[\'"]\)',  # t('key')
+    r'useTranslation\(\)[^\}]*\.t\([\'"]([^\'"]+)[\'"]\)',  # useTranslation()...t('key')
+    r'i18n\.t\([\'"]([^\'"]+)[\'"]\)',  # i18n.t('key')
+    r'<Trans[^>]*i18nKey=[\'"]\s*([^\'"]+)\s*[\'"][^>]*>',  # <Trans i18nKey="key">
+    r'{t\([\'"]([^\'"]+)[\'"]\)}',  # {t('key')}
+    r'[\'"`]t:([^\'"`;]+)[\'"`]',  # 't:key' (interpolation)
+    r'useTranslation\(\)[^\}]*\[[\'"]t[\'"]\]\([\'"]([^\'"]+)[\'"]\)'  # useTranslation()..["t"]('key')
+]
+
+# Anciennes corrections de fix_json_locales.py : trois passes re.sub sur tout
+# le fichier, puis json.loads
+def legacy_fix_json(content):
+    fixed = re.sub(r'([{,]\s*)([a-zA-Z0-9_\.]+)(\s*:)', r'\1"\2"\3', content)
+    fixed = re.sub(r',(\s*[}\]])', r'\1', fixed)
+    fixed = re.sub(r':\s*([a-zA-Z][a-zA-Z0-9_\.]*)(\s*[,}])', r': "\1"\2', fixed)
+    return json.loads(fixed)
+
+# Ancien flatten récursif (export_translation_audit.py)
+def legacy_flatten(d, prefix=''):
+    r = {}
+    for k, v in d.items():
+        key = f'{prefix}{k}'
+        if isinstance(v, dict):
+            r.update(legacy_flatten(v, key + '.'))
+        else:
+            r[key] = v
+    return r
+
+def legacy_extract_usages(content):
+    usages = []
+    for pattern in LEGACY_USAGE_PATTERNS:
+        usages.extend(re.findall(pattern, content))
+    return usages
+
+# Lire tous les fichiers source une seule fois, pour ne mesurer que l'extraction
+def load_sources(src_dir):
+    contents = []
+    for ext in ['.js', '.jsx', '.ts', '.tsx']:
+        for file_path in glob.glob(f"{src_dir}/**/*{ext}", recursive=True):
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                contents.append(f.read())
+    return contents
+
+# Meilleur temps sur plusieurs répétitions, en secondes
+def best_time(func, contents, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            func(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def report(label, seconds, count, unit="fichier"):
+    per_item = seconds / count * 1e6 if count else 0.0
+    print(f"  {label:<28} {seconds * 1000:9.2f} ms  ({per_item:8.1f} µs/{unit})")
+
+# Comparer l'extraction des clés avant/après sur l'arborescence src/
+def bench_usage_scan(src_dir, repeat):
+    contents = load_sources(src_dir)
+    print(f"=== EXTRACTION DES CLÉS ({len(contents)} fichiers dans {src_dir}) ===")
+
+    # Fichiers pour lesquels les clés trouvées diffèrent de l'ancienne implémentation
+    mismatches = sum(
+        1 for content in contents
+        if set(legacy_extract_usages(content)) != set(extract_usages(content))
+    )
+
+    legacy = best_time(legacy_extract_usages, contents, repeat)
+    combined = best_time(extract_usages, contents, repeat)
+    report("7 passes re.findall", legacy, len(contents))
+    report("extracteur actuel", combined, len(contents))
+    if combined:
+        print(f"  Accélération: x{legacy / combined:.2f}")
+    print(f"  Fichiers avec des résultats différents: {mismatches}")
+
+# Locale synthétique : sections imbriquées de profondeur variable
+def synthetic_locale(key_count, seed=0):
+    rng = random.Random(seed)
+    root = {}
+    for i in range(key_count):
+        depth = rng.randint(1, 5)
+        node = root
+        for level in range(depth):
+            node = node.setdefault(f"s{level}_{rng.randint(0, 9)}", {})
+        node[f"key{i}"] = f"Valeur {i}"
+    return root
+
+# Comparer l'ancien flatten récursif au parcours itératif sur une locale
+# synthétique, pour plusieurs langues partageant les mêmes clés
+def bench_flatten(key_count, languages, repeat):
+    locales = [synthetic_locale(key_count) for _ in range(languages)]
+    leaves = len(flatten(locales[0]))
+    print(f"=== APLATISSEMENT ({leaves} clés x {languages} langues) ===")
+
+    legacy = best_time(legacy_flatten, locales, repeat)
+    iterative = best_time(flatten, locales, repeat)
+    report("flatten récursif", legacy, languages, "langue")
+    report("flatten itératif", iterative, languages, "langue")
+    if iterative:
+        print(f"  Accélération: x{legacy / iterative:.2f}")
+
+    # Mémoire des clés : chaînes distinctes conservées pour toutes les langues
+    # (les résultats restent en vie pendant la mesure)
+    legacy_results = [legacy_flatten(locale) for locale in locales]
+    interned_results = [flatten(locale) for locale in locales]
+    legacy_keys = {id(key): sys.getsizeof(key) for flat in legacy_results for key in flat}
+    interned_keys = {id(key): sys.getsizeof(key) for flat in interned_results for key in flat}
+    print(f"  Chaînes de clés distinctes: {len(legacy_keys)} -> {len(interned_keys)} "
+          f"({sum(legacy_keys.values()) / 1e6:.1f} Mo -> {sum(interned_keys.values()) / 1e6:.1f} Mo)")
+
+    # Profondeur supérieure à la limite de récursion de Python
+    deep = node = {}
+    for level in range(sys.getrecursionlimit() * 2):
+        node = node.setdefault(f"n{level}", {})
+    node["leaf"] = "ok"
+    print(f"  Imbrication de {sys.getrecursionlimit() * 2} niveaux: {len(flatten(deep))} clé aplatie")
+
+# Comparer la règle des traductions suspectes en Python pur et avec NumPy
+def bench_suspects(key_count, repeat):
+    import verify_translations
+    rule = verify_translations.SuspectTranslationsRule()
+    rng = random.Random(0)
+    # Vocabulaire « traduit » de longueur comparable ; quelques valeurs
+    # identiques ou tronquées, et des mots préservés dans quelques pour cent
+    # des valeurs, comme dans public/locales/en/common.json
+    words = {f"word{n}": f"mot{n}x" for n in range(200)}
+    words.update({"email": "email", "Google": "Google", "LinkedIn": "LinkedIn"})
+    vocabulary = list(words)
+    pairs = []
+    for i in range(key_count):
+        ref_words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 4))]
+        ref = " ".join(ref_words)
+        roll = rng.random()
+        if roll < 0.05:
+            trans = ref
+        elif roll < 0.08:
+            trans = ref[:len(ref) // 3]
+        elif roll < 0.10:
+            trans = " ".join(words[w].replace("email", "courriel") for w in ref_words)
+        else:
+            trans = " ".join(words[w] for w in ref_words)
+        pairs.append((f"section.key{i}", ref, trans))
+    print(f"=== TRADUCTIONS SUSPECTES ({key_count} paires) ===")
+
+    def python_rule(items):
+        return [s for path, ref, trans in items for s in rule.on_leaf("xx", path, ref, trans)]
+
+    python_time = best_time(python_rule, [pairs], repeat)
+    report("Python pur", python_time, key_count, "paire")
+    if verify_translations.np is None:
+        print("  NumPy non disponible : mesure vectorisée ignorée")
+        return
+    numpy_time = best_time(lambda items: rule.on_pairs("xx", items), [pairs], repeat)
+    report("NumPy", numpy_time, key_count, "paire")
+    if numpy_time:
+        print(f"  Accélération: x{python_time / numpy_time:.2f}")
+    print(f"  Résultats identiques: {python_rule(pairs) == rule.on_pairs('xx', pairs)}")
+
+# Comparer le chargement à froid des fichiers JSON et de l'instantané .locpack
+# sur des locales synthétiques écrites dans un répertoire temporaire
+def bench_pack(key_count, languages, repeat):
+    from locale_pack import LocalePack, build_pack
+    from translation_matrix import TranslationMatrix
+    langs = [f"l{n}" for n in range(languages)]
+    with tempfile.TemporaryDirectory() as tmp:
+        locales_dir = f"{tmp}/locales"
+        # Mêmes clés dans toutes les langues, valeurs propres à chaque langue
+        source = json.dumps(synthetic_locale(key_count))
+        for lang in langs:
+            save_json(f"{locales_dir}/{lang}/common.json", json.loads(source.replace("Valeur", lang)))
+        pack_path = build_pack(locales_dir, f"{tmp}/locales.locpack")
+        print(f"=== INSTANTANÉ .locpack ({key_count} clés x {languages} langues) ===")
+
+        def json_matrix(_):
+            TranslationMatrix.from_store(LocaleStore(locales_dir), langs, "common")
+
+        def pack_matrix(_):
+            store = LocaleStore(locales_dir)
+            store.use_pack(pack_path)
+            TranslationMatrix.from_store(store, langs, "common")
+
+        def json_lookup(_):
+            LocaleStore(locales_dir).flat(langs[0]).get("s0_0.key0")
+
+        def pack_lookup(_):
+            pack = LocalePack(pack_path)
+            pack.get(langs[0], "common", "s0_0.key0")
+            pack.close()
+
+        report("JSON + matrice", best_time(json_matrix, [None], repeat), 1, "exécution")
+        report(".locpack + matrice", best_time(pack_matrix, [None], repeat), 1, "exécution")
+        report("JSON + une clé", best_time(json_lookup, [None], repeat), 1, "exécution")
+        report(".locpack + une clé", best_time(pack_lookup, [None], repeat), 1, "exécution")
+
+# Comparer l'analyse JSON et la lecture depuis le cache d'analyse
+def bench_parse(key_count, repeat):
+    from parse_cache import ParseCache
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = f"{tmp}/common.json"
+        save_json(file_path, synthetic_locale(key_count))
+        cache = ParseCache(f"{tmp}/parsed")
+        cache.load(file_path)
+        print(f"=== CACHE D'ANALYSE JSON ({key_count} clés) ===")
+
+        def parse(_):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                json.load(f)
+
+        parse_time = best_time(parse, [None], repeat)
+        cached_time = best_time(lambda _: cache.load(file_path), [None], repeat)
+        report("json.load", parse_time, 1, "fichier")
+        report("cache (sha256 + marshal)", cached_time, 1, "fichier")
+        if cached_time:
+            print(f"  Accélération: x{parse_time / cached_time:.2f}")
+
+# Comparer l'export d'audit par matrice et par fusion en flux : durée et pic
+# de mémoire, lecture des fichiers JSON comprise
+def bench_audit(key_count, languages, repeat):
+    from export_translation_audit import matrix_rows, stream_rows
+    langs = [f"l{n}" for n in range(languages)]
+    source = json.dumps(synthetic_locale(key_count))
+    with tempfile.TemporaryDirectory() as tmp:
+        for lang in langs:
+            save_json(f"{tmp}/{lang}/common.json", json.loads(source.replace("Valeur", lang)))
+        del source
+        print(f"=== EXPORT D'AUDIT ({key_count} clés x {languages} langues) ===")
+
+        for label, rows in (("matrice", matrix_rows), ("fusion en flux", stream_rows)):
+            def export(_):
+                # Nouveau magasin : chaque export relit les fichiers
+                for _ in rows(LocaleStore(tmp), langs, "common"):
+                    pass
+            seconds = best_time(export, [None], repeat)
+            tracemalloc.start()
+            export(None)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            report(f"{label} ({peak / 1e6:.1f} Mo)", seconds, 1, "export")
+
+# Comparer json.loads et l'analyseur tolérant sur un fichier valide, puis
+# l'analyseur tolérant et les anciennes passes re.sub sur un fichier abîmé
+def bench_relaxed(key_count, repeat):
+    from relaxed_json import loads_relaxed, parse_relaxed
+    valid = json.dumps(synthetic_locale(key_count), ensure_ascii=False, indent=2)
+    # Une clé sur dix sans guillemets, virgule finale dans chaque section
+    lines = valid.split("\n")
+    for i in range(0, len(lines), 10):
+        lines[i] = re.sub(r'^(\s*)"(\w+)":', r'\1\2:', lines[i])
+    broken = ",\n}".join("\n".join(lines).split("\n}"))
+    print(f"=== ANALYSE JSON TOLÉRANTE ({key_count} clés) ===")
+
+    report("json.loads (valide)", best_time(json.loads, [valid], repeat), 1, "fichier")
+    report("loads_relaxed (valide)", best_time(loads_relaxed, [valid], repeat), 1, "fichier")
+    legacy = best_time(legacy_fix_json, [broken], repeat)
+    relaxed = best_time(parse_relaxed, [broken], repeat)
+    report("3 passes re.sub (abîmé)", legacy, 1, "fichier")
+    report("parse_relaxed (abîmé)", relaxed, 1, "fichier")
+    report("parse_relaxed tout Python", best_time(lambda text: parse_relaxed(text, False), [broken], repeat),
+           1, "fichier")
+    print(f"  Corrections notées: {len(parse_relaxed(broken)[1])}, "
+          f"résultats identiques: {parse_relaxed(broken)[0] == legacy_fix_json(broken)}")
+
+    # Quelques erreurs isolées dans un gros fichier
+    sparse_lines = valid.split("\n")
+    for i in range(1, len(sparse_lines), len(sparse_lines) // 20):
+        sparse_lines[i] = re.sub(r'^(\s*)"(\w+)":', r'\1\2:', sparse_lines[i])
+    sparse = "\n".join(sparse_lines)
+    legacy = best_time(legacy_fix_json, [sparse], repeat)
+    targeted = best_time(parse_relaxed, [sparse], repeat)
+    python_only = best_time(lambda text: parse_relaxed(text, False), [sparse], repeat)
+    report("3 passes re.sub (20 erreurs)", legacy, 1, "fichier")
+    report("parse_relaxed (20 erreurs)", targeted, 1, "fichier")
+    report("tout Python (20 erreurs)", python_only, 1, "fichier")
+    print(f"  Corrections notées: {len(parse_relaxed(sparse)[1])}, "
+          f"résultats identiques: {parse_relaxed(sparse)[0] == legacy_fix_json(sparse)}")
+
+# Vérification des fichiers de locales : ancienne boucle (lecture, .bak,
+# json.loads), --check complet puis --check avec le manifeste des fichiers
+# déjà validés
+def bench_check(key_count, languages, repeat):
+    from fix_json_locales import check_files
+    namespaces = ["common", "translation", "demo", "privacy"]
+    with tempfile.TemporaryDirectory() as tmp:
+        filepaths = []
+        for i in range(languages):
+            for j, ns in enumerate(namespaces):
+                file_path = f"{tmp}/l{i}/{ns}.json"
+                save_json(file_path, synthetic_locale(key_count // len(namespaces), seed=i * 10 + j))
+                filepaths.append(file_path)
+        manifest = f"{tmp}/validated.json"
+        print(f"=== VÉRIFICATION DES LOCALES ({len(filepaths)} fichiers, {key_count} clés par langue) ===")
+
+        def legacy(_):
+            for file_path in filepaths:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                with open(file_path + '.bak', 'w', encoding='utf-8') as f:
+                    f.write(content)
+                json.loads(content)
+
+        def check(manifest_path):
+            with contextlib.redirect_stdout(io.StringIO()):
+                check_files(filepaths, manifest_path)
+
+        report("série + .bak", best_time(legacy, [None], repeat), len(filepaths))
+        report("--check", best_time(lambda _: check(None), [None], repeat), len(filepaths))
+        check(manifest)
+        report("--check, manifeste", best_time(lambda _: check(manifest), [None], repeat), len(filepaths))
+
+# Sauvegardes de plusieurs exécutions successives : copies complètes (ancien
+# backup/ et .bak) contre le stockage par empreinte compressé
+def bench_backup(key_count, languages, repeat, runs=10):
+    from locale_backup import BackupStore
+    with tempfile.TemporaryDirectory() as tmp:
+        filepaths = []
+        for i in range(languages):
+            file_path = f"{tmp}/l{i}/common.json"
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            save_json(file_path, synthetic_locale(key_count, seed=i))
+            filepaths.append(file_path)
+        print(f"=== SAUVEGARDES ({runs} exécutions, {len(filepaths)} fichiers de {key_count} clés) ===")
+
+        def directory_size(path):
+            return sum(os.path.getsize(os.path.join(root, name))
+                       for root, _, names in os.walk(path) for name in names)
+
+        def copies(_):
+            for run in range(runs):
+                for file_path in filepaths:
+                    shutil.copy2(file_path, f"{file_path}.{run}.bak")
+
+        def store(compression):
+            def backup(_):
+                backup_dir = f"{tmp}/backups-{compression}"
+                shutil.rmtree(backup_dir, ignore_errors=True)
+                backups = BackupStore(backup_dir, compression)
+                for run in range(runs):
+                    backup_run = backups.begin(f"bench{run}")
+                    for file_path in filepaths:
+                        backup_run.add(file_path)
+            return backup
+
+        report("copies complètes", best_time(copies, [None], repeat), runs * len(filepaths))
+        print(f"  Taille: {sum(os.path.getsize(p) for p in filepaths) * runs / 1e6:.1f} Mo")
+        compressions = ["gzip"] + (["zstd"] if importlib.util.find_spec("zstandard") else [])
+        for compression in compressions:
+            report(f"BackupStore ({compression})", best_time(store(compression), [None], repeat),
+                   runs * len(filepaths))
+            print(f"  Taille: {directory_size(f'{tmp}/backups-{compression}') / 1e6:.1f} Mo")
+
+# Réécriture d'un fichier de locale : ancienne écriture en place, puis
+# écriture atomique avec contenu identique (ignorée) ou modifié (fsync)
+def bench_write(key_count, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = f"{tmp}/common.json"
+        data = synthetic_locale(key_count)
+        changed = synthetic_locale(key_count, seed=1)
+        save_json(file_path, data)
+        print(f"=== ÉCRITURE DES LOCALES ({key_count} clés) ===")
+
+        def legacy(_):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+        def alternate(_):
+            save_json(file_path, changed)
+            save_json(file_path, data)
+
+        report("json.dump en place", best_time(legacy, [None], repeat), 1)
+        report("save_json (inchangé)", best_time(lambda _: save_json(file_path, data), [None], repeat), 1)
+        report("save_json (modifié)", best_time(alternate, [None], repeat) / 2, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance des outils i18n")
+    parser.add_argument("--src", default=SRC_DIR, help="répertoire des sources (défaut: src)")
+    parser.add_argument("--repeat", type=int, default=5, help="nombre de répétitions")
+    parser.add_argument("--bench", choices=["usage", "flatten", "suspects", "pack", "parse", "audit", "relaxed", "check", "backup", "write", "all"], default="all",
+                        help="mesure à lancer (défaut: all)")
+    parser.add_argument("--keys", type=int, default=200000,
+                        help="nombre de clés de la locale synthétique (défaut: 200000)")
+    parser.add_argument("--languages", type=int, default=5,
+                        help="nombre de langues synthétiques (défaut: 5)")
+    args = parser.parse_args()
+
+    if args.bench in ("usage", "all"):
+        bench_usage_scan(args.src, args.repeat)
+    if args.bench in ("flatten", "all"):
+        bench_flatten(args.keys, args.languages, args.repeat)
+    if args.bench in ("suspects", "all"):
+        bench_suspects(args.keys, args.repeat)
+    if args.bench in ("pack", "all"):
+        bench_pack(args.keys, args.languages, args.repeat)
+    if args.bench in ("parse", "all"):
+        bench_parse(args.keys, args.repeat)
+    if args.bench in ("audit", "all"):
+        bench_audit(args.keys, args.languages, args.repeat)
+    if args.bench in ("relaxed", "all"):
+        bench_relaxed(args.keys, args.repeat)
+    if args.bench in ("check", "all"):
+        bench_check(args.keys, args.languages, args.repeat)
+    if args.bench in ("backup", "all"):
+        bench_backup(args.keys, args.languages, args.repeat)
+    if args.bench in ("write", "all"):
+        bench_write(args.keys, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,276 @@
 #!/usr/bin/env python3
 import json
+import hashlib
 import os
 import re
 import sys
+import time
+import argparse
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import glob
 
+from locale_store import LOCALES_DIR, get_store, iter_flat
+from usage_cache import USAGE_CACHE_PATH, UsageCache
+
 # Chemins des répertoires
-LOCALES_DIR = "public/locales"
 SRC_DIR = "src"
 
-# Fonction pour charger un fichier JSON
-def load_json(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Erreur lors du chargement de {file_path}: {e}")
-        return {}
-
 # Fonction pour extraire toutes les clés de traduction d'un dictionnaire JSON
 def extract_translation_keys(json_obj, parent_key=''):
-    keys = []
-    if isinstance(json_obj, dict):
-        for k, v in json_obj.items():
-            new_key = f"{parent_key}.{k}" if parent_key else k
-            if isinstance(v, dict):
-                keys.extend(extract_translation_keys(v, new_key))
-            else:
-                keys.append(new_key)
-    return keys
+    if not isinstance(json_obj, dict):
+        return []
+    prefix = f"{parent_key}." if parent_key else ''
+    return [key for key, _ in iter_flat(json_obj, prefix)]
+
+# Version de l'extracteur : à incrémenter quand les motifs changent, pour
+# invalider le cache des clés extraites
+EXTRACTOR_VERSION = "2"
+
+# Suffixe des préfixes dynamiques : t(`plans.${plan}`) est rapporté comme
+# "plans.*" (toutes les clés commençant par "plans." peuvent être utilisées)
+DYNAMIC_SUFFIX = "*"
+
+# Repérage des sites d'appel en une seule passe sur le fichier. Les ancres
+# sont de courtes séquences littérales (rapides à rechercher) et ne
+# consomment que le début de l'appel ; le contexte est vérifié ensuite sur
+# place, ce qui retrouve aussi les formes imbriquées (ex: t('t:key')).
+USAGE_ANCHORS = re.compile(r't[(:]|<Trans|\]\(')
+IDENTIFIER_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$')
+BRACKET_T = ('["t"]', "['t']")
+
+# Premier argument d'un appel : chaîne simple ou double suivie d'une virgule
+# (options, valeur par défaut) ou de la parenthèse fermante, éventuellement
+# sur plusieurs lignes ; ou template literal, dont la partie fixe avant le
+# premier ${...} est un préfixe dynamique.
+FIRST_ARGUMENT = re.compile(
+    r'\s*(?:'
+    r'\'((?:[^\'\\\n]|\\.)*)\'\s*[,)]'
+    r'|"((?:[^"\\\n]|\\.)*)"\s*[,)]'
+    r'|`((?:[^`\\$]|\\.|\$(?!\{))*)(?:`\s*[,)]|(\$\{))'
+    r')'
+)
+TRANS_PATTERN = re.compile(r'<Trans\b[^>]*?\bi18nKey\s*=\s*\{?\s*[\'"]([^\'"]+)[\'"]')
+PREFIXED_PATTERN = re.compile(r'[\'"`]t:([^\'"`;]+)[\'"`]')
+
+# Préfixe de namespace i18next (ex: 'common:auth.login')
+NAMESPACE_PREFIX = re.compile(r'[\w-]+:')
+
+def _strip_namespace(key):
+    match = NAMESPACE_PREFIX.match(key)
+    return key[match.end():] if match else key
+
+# Fonction pour trouver les utilisations de traduction dans le contenu d'un fichier
+def extract_usages(content):
+    usages = []
+    for anchor in USAGE_ANCHORS.finditer(content):
+        start = anchor.start()
+        token = anchor.group()
+        if token == 't(':
+            # t(...), i18n.t(...), {t(...)} mais pas get(...) ni split(...)
+            if start and content[start - 1] in IDENTIFIER_CHARS:
+                continue
+        elif token == '](':
+            # ["t"](...)
+            if content[start - 4:start + 1] not in BRACKET_T:
+                continue
+        elif token == 't:':
+            # 't:key' (interpolation)
+            match = PREFIXED_PATTERN.match(content, start - 1) if start else None
+            if match:
+                usages.append(match.group(1))
+            continue
+        else:
+            match = TRANS_PATTERN.match(content, start)
+            if match:
+                usages.append(_strip_namespace(match.group(1).strip()))
+            continue
+        
+        match = FIRST_ARGUMENT.match(content, anchor.end())
+        if not match:
+            continue  # argument non littéral : t(variable)
+        single, double, template, interpolation = match.groups()
+        if interpolation:
+            if template:
+                usages.append(_strip_namespace(template) + DYNAMIC_SUFFIX)
+        else:
+            key = single if single is not None else double if double is not None else template
+            if key:
+                usages.append(_strip_namespace(key))
+    return usages
 
 # Fonction pour trouver les utilisations de traduction dans les fichiers de code
 def find_translation_usages(file_path):
     with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
         content = f.read()
     
-    # Motifs d'utilisation de traduction courants
-    patterns = [
-        r't\([\'"]([^\'"]+)[\'"]\)',  # t('key')
-        r'useTranslation\(\)[^\}]*\.t\([\'"]([^\'"]+)[\'"]\)',  # useTranslation()...t('key')
-        r'i18n\.t\([\'"]([^\'"]+)[\'"]\)',  # i18n.t('key')
-        r'<Trans[^>]*i18nKey=[\'"]\s*([^\'"]+)\s*[\'"][^>]*>',  # <Trans i18nKey="key">
-        r'{t\([\'"]([^\'"]+)[\'"]\)}',  # {t('key')}
-        r'[\'"`]t:([^\'"`;]+)[\'"`]',  # 't:key' (interpolation)
-        r'useTranslation\(\)[^\}]*\[[\'"]t[\'"]\]\([\'"]([^\'"]+)[\'"]\)'  # useTranslation()..["t"]('key')
-    ]
+    return extract_usages(content)
+
+# Lister les fichiers de code d'un ou plusieurs répertoires, triés pour un
+# ordre de rapport stable
+def list_code_files(src_dir=SRC_DIR):
+    src_dirs = [src_dir] if isinstance(src_dir, str) else src_dir
+    code_files = set()
+    for directory in src_dirs:
+        for ext in ['.js', '.jsx', '.ts', '.tsx']:
+            code_files.update(glob.glob(f"{directory}/**/*{ext}", recursive=True))
+    return sorted(code_files)
+
+# Extraire les clés d'un lot de contenus (exécuté dans un processus de travail)
+def _extract_chunk(contents):
+    return [extract_usages(content) for content in contents]
+
+# Trouver les utilisations dans tous les fichiers.
+# Retourne ({fichier: ensemble de clés}, {clé: [fichiers]}) : l'index inversé
+# est construit pendant la fusion, sans repasser sur les résultats.
+# Les fichiers sont d'abord regroupés par empreinte de contenu : les copies
+# identiques (arborescences dupliquées, ex: JobNexAI-WindSurf/ ou components/)
+# ne sont analysées qu'une fois et leurs clés attribuées à chaque chemin.
+# Avec un cache, seuls les fichiers modifiés depuis la dernière analyse sont
+# relus. Avec jobs > 1, les contenus sont répartis par lots entre plusieurs
+# processus ; la fusion suit l'ordre de la liste des fichiers, le résultat
+# est donc identique au mode séquentiel.
+def scan_sources(code_files, jobs=1, chunk_size=64, cache=None, stats=None):
+    cached = {}
+    file_stats = {}
+    to_scan = code_files
+    if cache is not None:
+        to_scan = []
+        for file_path in code_files:
+            stat = os.stat(file_path)
+            keys = cache.lookup(file_path, stat)
+            if keys is None:
+                file_stats[file_path] = stat
+                to_scan.append(file_path)
+            else:
+                cached[file_path] = keys
     
-    usages = []
-    for pattern in patterns:
-        matches = re.findall(pattern, content)
-        usages.extend(matches)
+    # Regrouper les chemins par contenu
+    blob_paths = {}
+    blob_usages = {}
+    pending = {}
+    for file_path in to_scan:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in blob_paths:
+            blob_paths[digest] = []
+            known = cache.lookup_blob(digest) if cache is not None else None
+            if known is not None:
+                blob_usages[digest] = known
+            else:
+                pending[digest] = data.decode('utf-8', errors='ignore')
+        blob_paths[digest].append(file_path)
     
-    return usages
+    # Analyser chaque contenu unique une seule fois
+    digests = list(pending)
+    contents = [pending[digest] for digest in digests]
+    chunks = [contents[i:i + chunk_size] for i in range(0, len(contents), chunk_size)]
+    if jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_extract_chunk, chunks)
+            extracted = [usages for chunk in results for usages in chunk]
+    else:
+        extracted = _extract_chunk(contents)
+    blob_usages.update(zip(digests, extracted))
+    
+    # Attribuer les clés à chaque chemin partageant le contenu
+    for digest, paths in blob_paths.items():
+        for file_path in paths:
+            cached[file_path] = blob_usages[digest]
+            if cache is not None:
+                cache.store(file_path, file_stats[file_path], digest, blob_usages[digest])
+    
+    if stats is not None:
+        stats["files"] = len(code_files)
+        stats["read"] = len(to_scan)
+        stats["unique"] = len(blob_paths)
+        stats["extracted"] = len(digests)
+    
+    file_usages = {}
+    key_index = defaultdict(list)
+    for file_path in code_files:
+        usages = cached[file_path]
+        if not usages:
+            continue
+        keys = set(usages)
+        file_usages[file_path] = keys
+        for key in keys:
+            key_index[key].append(file_path)
+    
+    return file_usages, dict(key_index)
+
+# Séparer les clés exactes des préfixes dynamiques ("plans.*" -> "plans.")
+def split_dynamic_usages(usages):
+    used_keys = set()
+    dynamic_prefixes = set()
+    for usage in usages:
+        if usage.endswith(DYNAMIC_SUFFIX):
+            dynamic_prefixes.add(usage[:-len(DYNAMIC_SUFFIX)])
+        else:
+            used_keys.add(usage)
+    return used_keys, dynamic_prefixes
+
+# Clés disponibles dans les fichiers de référence (anglais)
+REFERENCE_LANG = "en"
+REFERENCE_NAMESPACES = ["common", "translation"]
+
+def load_available_keys(store):
+    all_keys = []
+    for ns in REFERENCE_NAMESPACES:
+        all_keys.extend(extract_translation_keys(store.get(REFERENCE_LANG, ns)))
+    return set(all_keys)
+
+# Comparer les utilisations du code aux clés disponibles.
+# Retourne (clés utilisées, préfixes dynamiques, clés manquantes, clés inutilisées)
+def find_gaps(usages, available_keys):
+    used_keys, dynamic_prefixes = split_dynamic_usages(usages)
+    missing_keys = used_keys - available_keys
+    unused_keys = available_keys - used_keys
+    # Les clés couvertes par un préfixe dynamique peuvent être utilisées
+    if dynamic_prefixes:
+        covered = tuple(dynamic_prefixes)
+        unused_keys = {key for key in unused_keys if not key.startswith(covered)}
+    return used_keys, dynamic_prefixes, missing_keys, unused_keys
+
+# Exporter l'index clé -> fichiers en JSON pour les autres outils
+def write_key_index(key_index, output_path):
+    data = {key: key_index[key] for key in sorted(key_index)}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
 
 # Vérifier les traductions manquantes ou non utilisées
-def check_translations():
+def check_translations(src_dir=SRC_DIR, jobs=1, index_path=None, cache_path=USAGE_CACHE_PATH):
     print("Vérification de l'intégration des traductions dans le code\n")
     
     # 1. Charger les clés de traduction existantes
-    all_translation_keys = {}
-    for lang in ["en"]:  # Nous utilisons l'anglais comme référence
-        common_file = f"{LOCALES_DIR}/{lang}/common.json"
-        translation_file = f"{LOCALES_DIR}/{lang}/translation.json"
-        
-        common_json = load_json(common_file)
-        translation_json = load_json(translation_file)
-        
-        all_keys = extract_translation_keys(common_json)
-        all_keys.extend(extract_translation_keys(translation_json))
-        all_translation_keys[lang] = all_keys
+    available_keys = load_available_keys(get_store(LOCALES_DIR))
     
     # 2. Trouver les utilisations de traduction dans le code
-    code_files = []
-    for ext in ['.js', '.jsx', '.ts', '.tsx']:
-        code_files.extend(glob.glob(f"{SRC_DIR}/**/*{ext}", recursive=True))
-    
-    all_usages = []
-    file_usages = {}
-    for file_path in code_files:
-        usages = find_translation_usages(file_path)
-        if usages:
-            all_usages.extend(usages)
-            file_usages[file_path] = usages
+    code_files = list_code_files(src_dir)
+    cache = UsageCache(cache_path, EXTRACTOR_VERSION) if cache_path else None
+    scan_stats = {}
+    file_usages, key_index = scan_sources(code_files, jobs=jobs, cache=cache, stats=scan_stats)
+    if cache is not None:
+        for directory in ([src_dir] if isinstance(src_dir, str) else src_dir):
+            cache.prune(directory, set(code_files))
+        cache.close()
+        print(f"Cache: {cache.hits} fichiers inchangés, {cache.misses} fichiers relus")
+    if scan_stats["read"]:
+        print(f"Contenus uniques: {scan_stats['unique']} pour {scan_stats['read']} fichiers relus, "
+              f"{scan_stats['extracted']} analysés")
+    print()
+    if index_path:
+        write_key_index(key_index, index_path)
     
     # 3. Identifier les clés de traduction manquantes et inutilisées
-    used_keys = set(all_usages)
-    available_keys = set(all_translation_keys["en"])
-    
-    missing_keys = used_keys - available_keys
-    unused_keys = available_keys - used_keys
+    used_keys, dynamic_prefixes, missing_keys, unused_keys = find_gaps(key_index, available_keys)
     
     # 4. Générer le rapport
     print(f"=== RÉSUMÉ ===")
     print(f"Nombre total de clés de traduction disponibles: {len(available_keys)}")
     print(f"Nombre total de clés de traduction utilisées dans le code: {len(used_keys)}")
+    print(f"Nombre de préfixes dynamiques (template literals): {len(dynamic_prefixes)}")
     print(f"Nombre de clés manquantes (utilisées mais non définies): {len(missing_keys)}")
     print(f"Nombre de clés non utilisées (définies mais non utilisées): {len(unused_keys)}")
     
@@ -102,7 +278,7 @@ def check_translations():
         print("\n=== CLÉS MANQUANTES ===")
         print("Clés utilisées dans le code mais non définies dans les fichiers de traduction:")
         for key in sorted(missing_keys):
-            files = [file for file, keys in file_usages.items() if key in keys]
+            files = key_index[key]
             print(f"  - {key}")
             for file in files[:3]:  # Limiter à 3 fichiers pour plus de clarté
                 print(f"    Utilisé dans: {file}")
@@ -146,11 +322,119 @@ def check_translations():
         if len(parts) > 0:
             section_usage[parts[0]] += 1
     
-    for section, count in sorted(section_usage.items(), key=lambda x: x[1], reverse=True)[:10]:
+    for section, count in sorted(section_usage.items(), key=lambda x: (-x[1], x[0]))[:10]:
         print(f"  - {section}: {count} utilisations")
     
     print("\nVérification terminée.")
 
+# Empreinte légère (mtime, taille) des fichiers surveillés
+def snapshot_files(paths):
+    snapshot = {}
+    for file_path in paths:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def _print_delta(label, before, after, key_files=None):
+    for key in sorted(after - before):
+        files = sorted(key_files.get(key, ())) if key_files else []
+        where = f" ({files[0]})" if files else ""
+        print(f"  + {label}: {key}{where}")
+    for key in sorted(before - after):
+        print(f"  - {label}: {key}")
+
+# Mode surveillance : l'index des clés et les clés disponibles restent en
+# mémoire ; à chaque modification, seuls les fichiers touchés sont relus et
+# seules les différences (clés manquantes/inutilisées) sont affichées.
+# La détection se fait par scrutation périodique (mtime/taille), sans
+# dépendance à inotify.
+def watch_translations(src_dir=SRC_DIR, jobs=1, cache_path=USAGE_CACHE_PATH, interval=1.0):
+    store = get_store(LOCALES_DIR)
+    locale_files = [store.path(REFERENCE_LANG, ns) for ns in REFERENCE_NAMESPACES]
+    available_keys = load_available_keys(store)
+    
+    code_files = list_code_files(src_dir)
+    cache = UsageCache(cache_path, EXTRACTOR_VERSION) if cache_path else None
+    file_usages, key_index = scan_sources(code_files, jobs=jobs, cache=cache)
+    if cache is not None:
+        cache.close()
+    key_files = {key: set(files) for key, files in key_index.items()}
+    
+    _, _, missing_keys, unused_keys = find_gaps(key_files, available_keys)
+    src_dirs = [src_dir] if isinstance(src_dir, str) else src_dir
+    print(f"Surveillance de {', '.join(d + '/' for d in src_dirs)} et {LOCALES_DIR}/ (Ctrl+C pour arrêter)")
+    print(f"{len(missing_keys)} clés manquantes, {len(unused_keys)} clés non utilisées")
+    
+    code_snapshot = snapshot_files(code_files)
+    locale_snapshot = snapshot_files(locale_files)
+    try:
+        while True:
+            time.sleep(interval)
+            new_code_snapshot = snapshot_files(list_code_files(src_dir))
+            new_locale_snapshot = snapshot_files(locale_files)
+            changed = [
+                file_path for file_path in set(code_snapshot) | set(new_code_snapshot)
+                if code_snapshot.get(file_path) != new_code_snapshot.get(file_path)
+            ]
+            locales_changed = new_locale_snapshot != locale_snapshot
+            code_snapshot, locale_snapshot = new_code_snapshot, new_locale_snapshot
+            if not changed and not locales_changed:
+                continue
+            
+            # Mettre à jour l'index uniquement pour les fichiers touchés
+            for file_path in changed:
+                for key in file_usages.pop(file_path, ()):
+                    key_files[key].discard(file_path)
+                    if not key_files[key]:
+                        del key_files[key]
+                if file_path in new_code_snapshot:
+                    keys = set(find_translation_usages(file_path))
+                    if keys:
+                        file_usages[file_path] = keys
+                        for key in keys:
+                            key_files.setdefault(key, set()).add(file_path)
+            
+            if locales_changed:
+                for ns in REFERENCE_NAMESPACES:
+                    store.invalidate(REFERENCE_LANG, ns)
+                available_keys = load_available_keys(store)
+            
+            _, _, new_missing, new_unused = find_gaps(key_files, available_keys)
+            print(f"\n[{time.strftime('%H:%M:%S')}] {len(changed)} fichier(s) source modifié(s)"
+                  + (", traductions rechargées" if locales_changed else ""))
+            _print_delta("manquante", missing_keys, new_missing, key_files)
+            _print_delta("non utilisée", unused_keys, new_unused)
+            print(f"{len(new_missing)} clés manquantes, {len(new_unused)} clés non utilisées")
+            missing_keys, unused_keys = new_missing, new_unused
+    except KeyboardInterrupt:
+        print("\nSurveillance arrêtée.")
+
 # Programme principal
 if __name__ == "__main__":
-    check_translations()
+    parser = argparse.ArgumentParser(description="Vérification de l'intégration des traductions dans le code")
+    parser.add_argument("--src", nargs="+", default=[SRC_DIR],
+                        help="répertoires des sources (défaut: src) ; les copies identiques ne sont analysées qu'une fois")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="nombre de processus pour l'analyse (0 = tous les cœurs)")
+    parser.add_argument("--index-json", metavar="FICHIER",
+                        help="écrire l'index clé -> fichiers au format JSON")
+    parser.add_argument("--cache", default=USAGE_CACHE_PATH, metavar="FICHIER",
+                        help=f"cache des clés extraites (défaut: {USAGE_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="analyser tous les fichiers sans utiliser le cache")
+    parser.add_argument("--watch", action="store_true",
+                        help="surveiller les sources et les traductions et afficher les changements")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="intervalle de scrutation en secondes pour --watch (défaut: 1)")
+    args = parser.parse_args()
+    if args.watch:
+        watch_translations(src_dir=args.src, jobs=args.jobs or os.cpu_count() or 1,
+                           cache_path=None if args.no_cache else args.cache,
+                           interval=args.interval)
+        sys.exit(0)
+    check_translations(src_dir=args.src, jobs=args.jobs or os.cpu_count() or 1,
+                       index_path=args.index_json,
+                       cache_path=None if args.no_cache else args.cache)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import json
-import os
 import glob
 
+from locale_backup import BackupStore
+from locale_store import save_json
+
 # Structure minimale pour chaque langue
 base_translations = {
     "en": {
@@ -122,42 +123,35 @@ base_translations = {
     }
 }
 
-# Créer les fichiers de traduction de base
-os.makedirs("public/locales/backup", exist_ok=True)
-
 # Sauvegarder les fichiers existants
+backup = BackupStore().begin("create_base_translations")
 for file_path in glob.glob("public/locales/*/*.json"):
-    if "backup" not in file_path:
-        backup_path = file_path.replace("/locales/", "/locales/backup/")
-        os.makedirs(os.path.dirname(backup_path), exist_ok=True)
-        try:
-            with open(file_path, "r", encoding="utf-8") as src, open(backup_path, "w", encoding="utf-8") as dst:
-                dst.write(src.read())
-            print(f"Sauvegarde de {file_path} vers {backup_path}")
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde de {file_path}: {e}")
+    try:
+        backup.add(file_path)
+    except Exception as e:
+        print(f"Erreur lors de la sauvegarde de {file_path}: {e}")
+print(backup.summary())
 
-# Créer les nouveaux fichiers
+# Créer les nouveaux fichiers (seuls les fichiers dont le contenu change
+# sont réécrits)
+written = 0
 for lang, content in base_translations.items():
     # Créer common.json
-    os.makedirs(f"public/locales/{lang}", exist_ok=True)
-    with open(f"public/locales/{lang}/common.json", "w", encoding="utf-8") as f:
-        json.dump(content, f, ensure_ascii=False, indent=2)
+    written += save_json(f"public/locales/{lang}/common.json", content)
     
     # Créer translation.json (minimal)
-    with open(f"public/locales/{lang}/translation.json", "w", encoding="utf-8") as f:
-        json.dump({}, f, ensure_ascii=False, indent=2)
+    written += save_json(f"public/locales/{lang}/translation.json", {})
     
     if lang == "fr":
         # Créer demo.json et privacy.json
-        with open(f"public/locales/{lang}/demo.json", "w", encoding="utf-8") as f:
-            json.dump({"demo": {"title": "Démo", "description": "Description de démo"}}, f, ensure_ascii=False, indent=2)
+        written += save_json(f"public/locales/{lang}/demo.json",
+                             {"demo": {"title": "Démo", "description": "Description de démo"}})
         
-        with open(f"public/locales/{lang}/privacy.json", "w", encoding="utf-8") as f:
-            json.dump({"privacy": {"title": "Politique de confidentialité", 
-                                  "consent": "Je consens à...", 
-                                  "accept": "Accepter",
-                                  "decline": "Refuser"}}, f, ensure_ascii=False, indent=2)
+        written += save_json(f"public/locales/{lang}/privacy.json",
+                             {"privacy": {"title": "Politique de confidentialité", 
+                                          "consent": "Je consens à...", 
+                                          "accept": "Accepter",
+                                          "decline": "Refuser"}})
 
-print("Fichiers de traduction de base créés avec succès!")
-print("Les fichiers originaux ont été sauvegardés dans public/locales/backup/")
+print(f"Fichiers de traduction de base créés avec succès! ({written} fichiers écrits)")
+print(f"Les fichiers originaux peuvent être restaurés avec: python3 locale_backup.py restore {backup.run_id}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from itertools import groupby
+
+from locale_store import LOCALES_DIR, iter_sorted_flat
+
+
+# Racine du dépôt git et chemin des locales relatif à cette racine
+def repo_paths(locales_dir):
+    root = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True,
+                          check=True).stdout.decode("utf-8").strip()
+    return root, os.path.relpath(os.path.abspath(locales_dir), root).replace(os.sep, "/")
+
+# Fichiers <lang>/<ns>.json modifiés entre deux révisions, avec les blobs
+# avant/après : git ne compare que les arbres, sans extraction de fichiers
+def changed_files(root, locales_path, old_rev, new_rev):
+    output = subprocess.run(
+        ["git", "-C", root, "diff-tree", "-r", "-z", "--no-renames", old_rev, new_rev, "--", locales_path],
+        capture_output=True, check=True,
+    ).stdout.decode("utf-8")
+    fields = output.split("\0")
+    changes = []
+    prefix = locales_path.rstrip("/") + "/"
+    for header, path in zip(fields[0::2], fields[1::2]):
+        _, _, old_sha, new_sha, _ = header.lstrip(":").split(" ")
+        parts = path[len(prefix):].split("/")
+        if len(parts) != 2 or parts[0] == "backup" or not parts[1].endswith(".json"):
+            continue
+        changes.append((parts[0], parts[1][:-5], old_sha, new_sha))
+    return changes
+
+# Lire des blobs par un seul processus « git cat-file --batch » ; un
+# identifiant nul (fichier ajouté ou supprimé) donne None
+def read_blobs(root, shas):
+    blobs = {sha: None for sha in shas if not sha.strip("0")}
+    wanted = sorted(set(shas) - set(blobs))
+    if not wanted:
+        return blobs
+    process = subprocess.Popen(["git", "-C", root, "cat-file", "--batch"],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    # Une requête à la fois : ni l'entrée ni la sortie du processus ne se remplit
+    for sha in wanted:
+        process.stdin.write(f"{sha}\n".encode("ascii"))
+        process.stdin.flush()
+        header = process.stdout.readline().decode("ascii").split()
+        if header[1] == "missing":
+            blobs[sha] = None
+            continue
+        blobs[sha] = process.stdout.read(int(header[2]))
+        process.stdout.read(1)
+    process.stdin.close()
+    process.wait()
+    return blobs
+
+def parse_blob(content, label):
+    if content is None:
+        return {}
+    try:
+        return json.loads(content.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f"Erreur lors du chargement de {label}: {e}")
+        return {}
+
+# Fusion de deux flux (clé, valeur) triés : ("added"|"removed"|"changed",
+# clé, ancienne valeur, nouvelle valeur)
+def diff_streams(old, new):
+    old, new = iter(old), iter(new)
+    end = object()
+    o = next(old, end)
+    n = next(new, end)
+    while o is not end or n is not end:
+        if n is end or (o is not end and o[0] < n[0]):
+            yield "removed", o[0], o[1], None
+            o = next(old, end)
+        elif o is end or n[0] < o[0]:
+            yield "added", n[0], None, n[1]
+            n = next(new, end)
+        else:
+            if o[1] != n[1]:
+                yield "changed", o[0], o[1], n[1]
+            o = next(old, end)
+            n = next(new, end)
+
+def diff_revisions(old_rev, new_rev="HEAD", locales_dir=LOCALES_DIR):
+    root, locales_path = repo_paths(locales_dir)
+    changes = changed_files(root, locales_path, old_rev, new_rev)
+    blobs = read_blobs(root, [sha for _, _, old_sha, new_sha in changes for sha in (old_sha, new_sha)])
+    for lang, ns, old_sha, new_sha in sorted(changes):
+        old = parse_blob(blobs[old_sha], f"{old_rev}:{locales_path}/{lang}/{ns}.json")
+        new = parse_blob(blobs[new_sha], f"{new_rev}:{locales_path}/{lang}/{ns}.json")
+        for change, key, old_value, new_value in diff_streams(iter_sorted_flat(old), iter_sorted_flat(new)):
+            yield lang, ns, change, key, old_value, new_value
+
+def main():
+    parser = argparse.ArgumentParser(description="Différences de traductions entre deux révisions git")
+    parser.add_argument("old", help="révision de départ (ex.: origin/main)")
+    parser.add_argument("new", nargs="?", default="HEAD", help="révision d'arrivée (défaut: HEAD)")
+    parser.add_argument("--locales", default=LOCALES_DIR, help=f"répertoire des locales (défaut: {LOCALES_DIR})")
+    parser.add_argument("--output", "-o", help="écrire aussi les différences dans un fichier CSV")
+    args = parser.parse_args()
+
+    try:
+        rows = list(diff_revisions(args.old, args.new, args.locales))
+    except subprocess.CalledProcessError as e:
+        print(f"Erreur git: {e.stderr.decode('utf-8', 'replace').strip() if e.stderr else e}")
+        sys.exit(1)
+
+    print(f"Différences de traductions entre {args.old} et {args.new}")
+    if not rows:
+        print("\nAucune différence.")
+    labels = {"added": "+", "removed": "-", "changed": "~"}
+    for (lang, ns), group in groupby(rows, key=lambda row: row[:2]):
+        group = list(group)
+        counts = Counter(row[2] for row in group)
+        print(f"\n{lang}/{ns}: {counts['added']} ajoutées, {counts['removed']} supprimées, "
+              f"{counts['changed']} modifiées")
+        for _, _, change, key, old_value, new_value in group:
+            if change == "changed":
+                print(f"  {labels[change]} {key}: \"{old_value}\" -> \"{new_value}\"")
+            else:
+                print(f"  {labels[change]} {key}: \"{new_value if change == 'added' else old_value}\"")
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["lang", "namespace", "change", "key", "old", "new"])
+            for lang, ns, change, key, old_value, new_value in rows:
+                w.writerow([lang, ns, change, key,
+                            "" if old_value is None else old_value,
+                            "" if new_value is None else new_value])
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,6 @@
 #!/usr/bin/env python3
-import json
-import os
-import glob
-import shutil
-
-# Fonction pour charger un fichier JSON existant
-def load_json(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-# Fonction pour sauvegarder un fichier JSON
-def save_json(file_path, data):
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+from locale_backup import BackupStore
+from locale_store import get_store
 
 # Structure des traductions pour la section "auth"
 auth_translations = {
@@ -224,35 +208,31 @@ auth_translations = {
 
 # Créer une sauvegarde des fichiers existants
 print("Création d'une sauvegarde des fichiers existants...")
+backup = BackupStore().begin("enrich_auth")
 for lang in auth_translations.keys():
     src_file = f"public/locales/{lang}/common.json"
-    backup_dir = "public/locales/backup"
-    backup_lang_dir = f"{backup_dir}/{lang}"
-    os.makedirs(backup_lang_dir, exist_ok=True)
-    backup_file = f"{backup_lang_dir}/common.json"
-    
     try:
-        # Vérifier si le fichier source existe
-        if os.path.exists(src_file):
-            shutil.copy2(src_file, backup_file)
-            print(f"Sauvegarde créée: {backup_file}")
+        # Un fichier source absent est simplement ignoré
+        backup.add(src_file)
     except Exception as e:
         print(f"Erreur lors de la sauvegarde de {src_file}: {e}")
+print(backup.summary())
 
 # Enrichir les fichiers existants
 print("\nEnrichissement des fichiers de traduction pour la section 'auth'...")
+store = get_store(quiet=True)
 for lang, content in auth_translations.items():
-    file_path = f"public/locales/{lang}/common.json"
-    existing_data = load_json(file_path)
+    file_path = store.path(lang, "common")
     
     # Fusion des données (priorité aux nouvelles)
-    for section, values in content.items():
-        if section not in existing_data:
-            existing_data[section] = {}
-        existing_data[section].update(values)
-    
-    # Sauvegarde du fichier enrichi
-    save_json(file_path, existing_data)
-    print(f"Fichier {file_path} enrichi avec succès")
+    changes = store.merge(lang, "common", content)
+    if changes:
+        print(f"Fichier {file_path} enrichi avec succès ({changes} valeurs)")
+    else:
+        print(f"Fichier {file_path} déjà à jour")
+
+# Sauvegarde des seuls fichiers enrichis
+written = store.save()
+print(f"{len(written)} fichiers écrits.")
 
 print("\nEnrichissement terminé pour la section 'auth'.")
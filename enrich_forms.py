@@ -1,22 +1,5 @@
 #!/usr/bin/env python3
-import json
-import os
-import glob
-import shutil
-
-# Fonction pour charger un fichier JSON existant
-def load_json(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-# Fonction pour sauvegarder un fichier JSON
-def save_json(file_path, data):
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+from locale_store import get_store
 
 # Structure des traductions pour la section "forms"
 forms_translations = {
@@ -344,18 +327,19 @@ forms_translations = {
 
 # Enrichir les fichiers existants
 print("Enrichissement des fichiers de traduction pour la section 'forms'...")
+store = get_store(quiet=True)
 for lang, content in forms_translations.items():
-    file_path = f"public/locales/{lang}/common.json"
-    existing_data = load_json(file_path)
+    file_path = store.path(lang, "common")
     
     # Fusion des données (priorité aux nouvelles)
-    for section, values in content.items():
-        if section not in existing_data:
-            existing_data[section] = {}
-        existing_data[section].update(values)
-    
-    # Sauvegarde du fichier enrichi
-    save_json(file_path, existing_data)
-    print(f"Fichier {file_path} enrichi avec succès")
+    changes = store.merge(lang, "common", content)
+    if changes:
+        print(f"Fichier {file_path} enrichi avec succès ({changes} valeurs)")
+    else:
+        print(f"Fichier {file_path} déjà à jour")
+
+# Sauvegarde des seuls fichiers enrichis
+written = store.save()
+print(f"{len(written)} fichiers écrits.")
 
 print("\nEnrichissement terminé pour la section 'forms'.")
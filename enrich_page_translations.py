@@ -1,22 +1,6 @@
 #!/usr/bin/env python3
-import json
-import os
-import glob
-import shutil
-
-# Fonction pour charger un fichier JSON existant
-def load_json(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-# Fonction pour sauvegarder un fichier JSON
-def save_json(file_path, data):
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+from locale_backup import BackupStore
+from locale_store import get_store
 
 # Structure des traductions pour les pages spécifiques
 page_translations = {
@@ -160,6 +144,8 @@ def enrich_page_translations():
     # Traductions pour les autres langues
     # Nous allons garder les clés en anglais, mais ajouter les traductions dans les autres langues
     translations = {}
+    store = get_store(quiet=True)
+    backup = BackupStore().begin("enrich_page_translations")
     
     # Charger les traductions en anglais comme référence
     translations["en"] = page_translations["en"]
@@ -169,8 +155,7 @@ def enrich_page_translations():
     for lang in languages:
         if lang != "en":
             # Charger le fichier translation.json existant
-            file_path = f"public/locales/{lang}/translation.json"
-            existing_data = load_json(file_path)
+            existing_data = store.get(lang, "translation")
             
             # Fusionner avec les traductions en anglais (pour conserver la structure)
             translations[lang] = page_translations["en"]
@@ -195,18 +180,19 @@ def enrich_page_translations():
     
     # Sauvegarder les traductions dans les fichiers translation.json
     for lang, content in translations.items():
-        file_path = f"public/locales/{lang}/translation.json"
+        file_path = store.path(lang, "translation")
         
         # Créer une sauvegarde du fichier existant
-        if os.path.exists(file_path):
-            backup_path = f"public/locales/backup/{lang}/translation.json.bak"
-            os.makedirs(os.path.dirname(backup_path), exist_ok=True)
-            shutil.copy2(file_path, backup_path)
-            print(f"Sauvegarde créée: {backup_path}")
+        backup.add(file_path)
         
         # Sauvegarder le fichier enrichi
-        save_json(file_path, content)
+        store.set(lang, "translation", content)
         print(f"Fichier {file_path} enrichi avec succès")
+    
+    written = store.save()
+    print(f"{len(written)} fichiers écrits.")
+    if backup.files:
+        print(backup.summary())
 
 # Programme principal
 def main():
@@ -1,25 +1,237 @@
-import json, csv, os
-langs = ['en','fr','es','it','de']
-base = '/Volumes/Seagate1TO/WindSurf/JobNexus-WindSurf/public/locales'
-
-def flatten(d, prefix=''):
-    r = {}
-    for k, v in d.items():
-        key = f'{prefix}{k}'
-        if isinstance(v, dict):
-            r.update(flatten(v, key + '.'))
-        else:
-            r[key] = v
-    return r
-
-files = {l: json.load(open(os.path.join(base, l, 'translation.json'))) for l in langs}
-flat = {l: flatten(files[l]) for l in langs}
-keys = set()
-for l in langs:
-    keys.update(flat[l].keys())
-
-with open('/Volumes/Seagate1TO/WindSurf/JobNexus-WindSurf/translation_audit.csv', 'w', newline='', encoding='utf-8') as f:
-    w = csv.writer(f)
-    w.writerow(['key'] + langs)
-    for k in sorted(keys):
-        w.writerow([k] + [flat[l].get(k, '') for l in langs])
+import argparse, csv, heapq, marshal, os, struct, tempfile
+from contextlib import ExitStack
+from operator import itemgetter
+from locale_store import LOCALES_DIR, LocaleStore, iter_sorted_flat, load_json
+from translation_matrix import TranslationMatrix
+
+# openpyxl n'est nécessaire que pour l'export XLSX
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+except ImportError:
+    Workbook = None
+
+# pyarrow n'est nécessaire que pour les exports Parquet et Arrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+REFERENCE_LANG = 'en'
+FORMATS = {'.csv': 'csv', '.tsv': 'tsv', '.xlsx': 'xlsx', '.parquet': 'parquet', '.arrows': 'arrow'}
+BATCH_ROWS = 10000
+# Paires (clé, valeur) par bloc des fichiers temporaires de --stream
+RUN_BLOCK = 4096
+
+# Lignes (clé, [valeur par langue]) à partir de la matrice clé x langue
+def matrix_rows(store, langs, ns):
+    matrix = TranslationMatrix.from_store(store, langs, ns)
+    columns = [matrix.column(l) for l in langs]
+    for i, k in enumerate(matrix.keys):
+        yield k, [column[i] for column in columns]
+
+# Fusion k-voies de flux (clé, valeur) triés, un par langue : chaque ligne est
+# produite dès que sa clé est complète, sans dictionnaire aplati ni ensemble
+# de toutes les clés en mémoire
+def tagged(stream, i):
+    for k, v in stream:
+        yield k, i, v
+
+# Comparaison sur (clé, langue) seulement : une clé aplatie présente deux
+# fois dans un même fichier ("a.b" et {"a": {"b": ...}}) ne compare jamais
+# les valeurs
+def merge_rows(streams):
+    merged = heapq.merge(*[tagged(stream, i) for i, stream in enumerate(streams)], key=itemgetter(0, 1))
+    key, row = None, None
+    for k, i, v in merged:
+        if k != key:
+            if row is not None:
+                yield key, row
+            key, row = k, [None] * len(streams)
+        row[i] = v
+    if row is not None:
+        yield key, row
+
+# Suite triée (clé, valeur) d'un fichier, écrite dans un fichier temporaire
+# (blocs de RUN_BLOCK paires en marshal, comme parse_cache.py, précédés de
+# leur taille) : l'arbre est libéré avant de lire la langue suivante. Le
+# fichier est lu hors du cache du magasin.
+RUN_BLOCK_SIZE = struct.Struct('<I')
+
+def spill_run(path, quiet, run):
+    def write(block):
+        data = marshal.dumps(block)
+        run.write(RUN_BLOCK_SIZE.pack(len(data)))
+        run.write(data)
+
+    block = []
+    for item in iter_sorted_flat(load_json(path, quiet=quiet)):
+        block.append(item)
+        if len(block) == RUN_BLOCK:
+            write(block)
+            block = []
+    if block:
+        write(block)
+    run.seek(0)
+    return run
+
+# Un seul bloc décodé à la fois
+def read_run(run):
+    while True:
+        size = run.read(RUN_BLOCK_SIZE.size)
+        if not size:
+            return
+        yield from marshal.loads(run.read(RUN_BLOCK_SIZE.unpack(size)[0]))
+
+# Un seul arbre JSON en mémoire à la fois (le plus gros fichier du
+# namespace), puis fusion des suites relues ligne à ligne
+def stream_rows(store, langs, ns):
+    with ExitStack() as stack:
+        runs = [spill_run(store.path(l, ns), store.quiet,
+                          stack.enter_context(tempfile.TemporaryFile()))
+                for l in langs]
+        yield from merge_rows([read_run(run) for run in runs])
+
+# Langues (référence en premier) et namespaces présents sur le disque
+def discover(store, langs=None, namespaces=None):
+    langs = langs or sorted(store.languages(), key=lambda l: (l != REFERENCE_LANG, l))
+    namespaces = namespaces or sorted({ns for l in langs for ns in store.namespaces(l)})
+    return langs, namespaces
+
+# Lignes (namespace, clé, [valeur par langue]) de tous les namespaces ; une
+# langue sans fichier pour un namespace a des cellules vides
+def audit_rows(store, langs, namespaces, stream=False):
+    for ns in namespaces:
+        present = [l for l in langs if ns in store.namespaces(l)]
+        if not present:
+            continue
+        positions = [langs.index(l) for l in present]
+        rows = stream_rows(store, present, ns) if stream else matrix_rows(store, present, ns)
+        for k, values in rows:
+            if len(present) < len(langs):
+                full = [None] * len(langs)
+                for position, v in zip(positions, values):
+                    full[position] = v
+                values = full
+            yield ns, k, values
+
+def write_delimited(rows, header, path, delimiter=','):
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f, delimiter=delimiter)
+        w.writerow(header)
+        for ns, k, values in rows:
+            w.writerow([ns, k] + ['' if v is None else v for v in values])
+            count += 1
+    return count
+
+# Cellule de classeur : openpyxl refuse les listes (ex. pricing.plans.*.features),
+# converties en texte comme dans les exports CSV et Arrow
+def xlsx_cell(v):
+    if v is None:
+        return ''
+    return v if isinstance(v, (str, int, float, bool)) else str(v)
+
+# Classeur en mode écriture seule : les lignes sont écrites au fil de l'eau
+def write_xlsx(rows, header, path):
+    if Workbook is None:
+        raise SystemExit("L'export XLSX nécessite openpyxl (pip install openpyxl)")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Audit')
+    bold = Font(bold=True)
+    cells = []
+    for title in header:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = bold
+        cells.append(cell)
+    ws.append(cells)
+    count = 0
+    for ns, k, values in rows:
+        ws.append([ns, k] + [xlsx_cell(v) for v in values])
+        count += 1
+    wb.save(path)
+    return count
+
+# Schéma Arrow : namespace et clé encodés par dictionnaire, une colonne
+# texte par langue
+def arrow_schema(langs):
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([pa.field('namespace', dictionary), pa.field('key', dictionary)]
+                     + [pa.field(l, pa.string()) for l in langs])
+
+# Lots de batch_rows lignes : seul le lot en cours est gardé en mémoire
+def record_batches(rows, langs, batch_rows=BATCH_ROWS):
+    schema = arrow_schema(langs)
+
+    def batch(columns):
+        arrays = [pa.array(column, pa.string()).dictionary_encode() for column in columns[:2]]
+        arrays += [pa.array(column, pa.string()) for column in columns[2:]]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    columns = [[] for _ in range(len(langs) + 2)]
+    for ns, k, values in rows:
+        columns[0].append(ns)
+        columns[1].append(k)
+        for column, v in zip(columns[2:], values):
+            column.append(None if v is None else str(v))
+        if len(columns[0]) >= batch_rows:
+            yield batch(columns)
+            columns = [[] for _ in range(len(langs) + 2)]
+    if columns[0]:
+        yield batch(columns)
+
+# Parquet (dictionnaire conservé par groupe de lignes) ou flux Arrow IPC
+# (le format flux accepte un nouveau dictionnaire à chaque lot)
+def write_arrow(rows, langs, path, fmt='parquet', batch_rows=BATCH_ROWS):
+    if pa is None:
+        raise SystemExit("Les exports Parquet et Arrow nécessitent pyarrow (pip install pyarrow)")
+    schema = arrow_schema(langs)
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_stream(path, schema)
+    count = 0
+    with writer:
+        for batch in record_batches(rows, langs, batch_rows):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+def export_audit(locales_dir=LOCALES_DIR, output='translation_audit.csv', fmt=None,
+                 langs=None, namespaces=None, stream=False, batch_rows=BATCH_ROWS):
+    fmt = fmt or FORMATS.get(os.path.splitext(output)[1].lower(), 'csv')
+    store = LocaleStore(locales_dir)
+    langs, namespaces = discover(store, langs, namespaces)
+    if not stream:
+        store.use_pack()
+    rows = audit_rows(store, langs, namespaces, stream)
+    header = ['namespace', 'key'] + langs
+    if fmt == 'xlsx':
+        count = write_xlsx(rows, header, output)
+    elif fmt in ('parquet', 'arrow'):
+        count = write_arrow(rows, langs, output, fmt, batch_rows)
+    else:
+        count = write_delimited(rows, header, output, '\t' if fmt == 'tsv' else ',')
+    return count, langs, namespaces
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export de l'audit des traductions (toutes langues, tous namespaces)")
+    parser.add_argument('--locales', default=LOCALES_DIR, help=f'répertoire des locales (défaut: {LOCALES_DIR})')
+    parser.add_argument('--langs', nargs='+', help='langues à exporter (défaut: toutes, référence en premier)')
+    parser.add_argument('--ns', nargs='+', help='namespaces à exporter (défaut: tous)')
+    parser.add_argument('--output', '-o', default='translation_audit.csv',
+                        help='fichier de sortie (défaut: translation_audit.csv)')
+    parser.add_argument('--format', choices=sorted(set(FORMATS.values())),
+                        help="format de sortie (défaut: d'après l'extension)")
+    parser.add_argument('--stream', action='store_true',
+                        help='fusion en flux des langues via des fichiers temporaires (un seul fichier '
+                             'de langue en mémoire à la fois, sans matrice)')
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS,
+                        help=f'lignes par lot Parquet/Arrow (défaut: {BATCH_ROWS})')
+    args = parser.parse_args()
+    count, langs, namespaces = export_audit(args.locales, args.output, args.format,
+                                            args.langs, args.ns, args.stream, args.batch_rows)
+    print(f"Audit écrit: {args.output} ({count} lignes, langues: {', '.join(langs)}, "
+          f"namespaces: {', '.join(namespaces)})")
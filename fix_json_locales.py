@@ -1,119 +1,169 @@
 #!/usr/bin/env python3
+import argparse
+import glob
+import hashlib
 import json
 import os
-import glob
-import re
+import sys
+from collections import Counter
+
+from i18n_config import CACHE_DIR
+from locale_backup import BackupStore
+from locale_store import save_json, write_if_changed
+from relaxed_json import DECODER, RelaxedJSONError, parse_relaxed
+
+LOCALE_FILES = 'public/locales/*/*.json'
+LOCALES_ROOT = 'public/locales'
+# Empreinte sha256 des fichiers trouvés valides par --check : un fichier
+# inchangé depuis n'est pas relu
+VALIDATED_MANIFEST = os.path.join(CACHE_DIR, "validated.json")
+
+# Fichiers lus par --check : tous les .json de l'arborescence (backup et
+# sous-dossiers compris), comme l'ancien check-json-locales.js
+def locale_json_files(root=LOCALES_ROOT):
+    filepaths = []
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories.sort()
+        filepaths.extend(os.path.join(directory, name) for name in sorted(names) if name.endswith('.json'))
+    return filepaths
+
+# Valider un fichier sans le modifier : (empreinte, erreur ou None, déjà
+# validé). Toute valeur JSON est acceptée, comme avec JSON.parse.
+def check_file(filepath, validated):
+    try:
+        with open(filepath, 'rb') as f:
+            content = f.read()
+    except OSError as e:
+        return None, str(e), False
+    digest = hashlib.sha256(content).hexdigest()
+    if validated.get(filepath) == digest:
+        return digest, None, True
+    try:
+        DECODER.decode(content.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        return digest, str(e), False
+    return digest, None, False
+
+def load_manifest(path=VALIDATED_MANIFEST):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# Écriture atomique ; un cache en lecture seule n'empêche jamais la
+# vérification
+def save_manifest(validated, path=VALIDATED_MANIFEST):
+    try:
+        write_if_changed(path, json.dumps(validated, indent=0, sort_keys=True).encode('utf-8'))
+    except OSError:
+        pass
+
+# Fichiers qui font échouer --check : ceux que le mode correction répare
+# (<lang>/<ns>.json, hors backup). Les autres ne sont que signalés, comme le
+# faisait check-json-locales.js.
+def is_gated(filepath, root=LOCALES_ROOT):
+    parts = os.path.relpath(filepath, root).split(os.sep)
+    return len(parts) == 2 and parts[0] != "backup"
+
+# Vérification seule : aucun fichier de locale ni sauvegarde n'est écrit.
+# Retourne le nombre de fichiers invalides parmi ceux pour lesquels
+# gated(chemin) est vrai (tous par défaut) ; les autres erreurs sont
+# seulement signalées.
+def check_files(filepaths, manifest_path=VALIDATED_MANIFEST, gated=None):
+    validated = load_manifest(manifest_path) if manifest_path else {}
+    previous = dict(validated)
+    errors = 0
+    warnings = 0
+    skipped = 0
+    for filepath in filepaths:
+        digest, error, cached = check_file(filepath, previous)
+        skipped += cached
+        if error is None:
+            validated[filepath] = digest
+            continue
+        validated.pop(filepath, None)
+        if gated is None or gated(filepath):
+            errors += 1
+            print(f"ERREUR JSON: {filepath}\n  {error}")
+        else:
+            warnings += 1
+            print(f"ERREUR JSON (non bloquante): {filepath}\n  {error}")
+    # Les fichiers supprimés sortent du manifeste
+    validated = {p: digest for p, digest in validated.items() if os.path.exists(p)}
+    if manifest_path and validated != previous:
+        save_manifest(validated, manifest_path)
+    print(f"Vérification: {len(filepaths)} fichiers, {errors} invalides, "
+          f"{warnings} invalides non bloquants, {skipped} inchangés depuis la dernière validation")
+    return errors
 
-def fix_json_file(filepath):
+# Corriger un fichier ; retourne "written" (corrigé et écrit), "valid" (déjà
+# valide, non modifié) ou "failed"
+def fix_json_file(filepath, backup=None):
     print(f"Traitement de {filepath}")
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
-    
-    # Sauvegarde
-    with open(filepath + '.bak', 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    # Trouve la première accolade ouvrante et la dernière fermante
-    first_brace = content.find('{')
-    
-    if first_brace == -1:
-        print(f"  ERREUR: Pas d'accolade ouvrante dans {filepath}")
-        return False
-    
-    # Reconstruit un JSON valide en partant de zéro
+
+    # Un fichier valide est lu par l'analyseur C ; sinon l'analyseur tolérant
+    # corrige le fichier en une seule passe (clés et valeurs sans guillemets,
+    # virgules en trop ou manquantes, accolades non fermées...), en ne
+    # reprenant en Python que les objets qui contiennent une erreur
     try:
-        # Essai de parsing pour voir si c'est déjà valide
-        json.loads(content)
-        print(f"  OK: {filepath} est déjà valide")
-        return True
-    except json.JSONDecodeError as e:
+        parsed, repairs = DECODER.decode(content), []
+    except ValueError as e:
         print(f"  ERREUR JSON: {e}")
-        
-        # Essai de correction des guillemets manquants aux noms de propriétés
         try:
-            # Correction 1: propriétés sans guillemets
-            fixed_content = re.sub(r'([{,]\s*)([a-zA-Z0-9_\.]+)(\s*:)', r'\1"\2"\3', content)
-            
-            # Correction 2: virgules en trop
-            fixed_content = re.sub(r',(\s*[}\]])', r'\1', fixed_content)
-            
-            # Correction 3: valeurs sans guillemets qui ne sont pas des nombres ou bool
-            fixed_content = re.sub(r':\s*([a-zA-Z][a-zA-Z0-9_\.]*)(\s*[,}])', r': "\1"\2', fixed_content)
-            
-            # Essai de parsing pour vérifier la validité
-            parsed = json.loads(fixed_content)
-            
-            # Si on arrive ici, le JSON est valide
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(parsed, f, ensure_ascii=False, indent=2)
-            print(f"  CORRIGÉ: {filepath}")
-            return True
-            
-        except Exception as e2:
+            parsed, repairs = parse_relaxed(content)
+        except RelaxedJSONError as e2:
             print(f"  ÉCHEC DE CORRECTION: {e2}")
-            
-            # Dernière tentative: Utiliser un parsing plus robuste
-            try:
-                # Utilise le module 'demjson' s'il est disponible
-                # pip install demjson3
-                import demjson3
-                parsed = demjson3.decode(content)
-                
-                # Si on arrive ici, le parsing a réussi
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(parsed, f, ensure_ascii=False, indent=2)
-                print(f"  CORRIGÉ AVEC DEMJSON: {filepath}")
-                return True
-                
-            except ImportError:
-                print("  Module demjson3 non disponible, installation nécessaire: pip install demjson3")
-                return False
-            except Exception as e3:
-                print(f"  ÉCHEC FINAL: {e3}")
-                
-                # Dernière tentative simpliste: prendre la partie entre les accolades
-                try:
-                    # Trouve l'accolade fermante
-                    depth = 0
-                    pos = 0
-                    for i, char in enumerate(content):
-                        if char == '{':
-                            depth += 1
-                        elif char == '}':
-                            depth -= 1
-                            if depth == 0:
-                                pos = i
-                                break
-                    
-                    if pos > 0:
-                        simplified = content[:pos+1]
-                        # Ajoute les propriétés manquantes si nécessaire
-                        if simplified[-1] != '}':
-                            simplified += '}'
-                        
-                        # Valide à nouveau
-                        json.loads(simplified)
-                        
-                        # Écriture du fichier simplifié
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            f.write(simplified)
-                        print(f"  CORRIGÉ PAR SIMPLIFICATION: {filepath}")
-                        return True
-                except Exception as e4:
-                    print(f"  ÉCHEC DE SIMPLIFICATION: {e4}")
-                    return False
-
-# Parcourir tous les fichiers JSON de langues
-count_total = 0
-count_fixed = 0
-count_failed = 0
-
-for filepath in glob.glob('public/locales/*/*.json'):
-    count_total += 1
-    if fix_json_file(filepath):
-        count_fixed += 1
-    else:
-        count_failed += 1
-
-print(f"\nRésumé: {count_total} fichiers traités, {count_fixed} corrigés, {count_failed} en échec")
-print("Les fichiers originaux ont été sauvegardés avec l'extension .bak")
+            return "failed"
+
+    if not isinstance(parsed, dict):
+        print(f"  ERREUR: {filepath} ne contient pas d'objet JSON")
+        return "failed"
+
+    if not repairs:
+        print(f"  OK: {filepath} est déjà valide")
+        return "valid"
+
+    for line, column, message in repairs:
+        print(f"  - ligne {line}, colonne {column}: {message}")
+
+    # Sauvegarde, seulement pour un fichier à corriger
+    if backup is not None:
+        backup.add(filepath, content)
+
+    # Réécriture en JSON canonique
+    if not save_json(filepath, parsed):
+        print(f"  OK: {filepath} inchangé après correction")
+        return "valid"
+    print(f"  CORRIGÉ: {filepath} ({len(repairs)} corrections)")
+    return "written"
+
+def main():
+    parser = argparse.ArgumentParser(description="Correction des fichiers JSON de langues")
+    parser.add_argument("files", nargs="*",
+                        help=f"fichiers à traiter (défaut: {LOCALE_FILES}, ou tous les .json de {LOCALES_ROOT} avec --check)")
+    parser.add_argument("--check", action="store_true",
+                        help="vérifier sans corriger (code de sortie 1 si un fichier que la correction "
+                             "traite est invalide ; les erreurs de backup/ sont seulement signalées)")
+    parser.add_argument("--no-cache", action="store_true", help="revérifier aussi les fichiers déjà validés")
+    args = parser.parse_args()
+
+    if args.check:
+        errors = check_files(args.files or locale_json_files(), None if args.no_cache else VALIDATED_MANIFEST,
+                             None if args.files else is_gated)
+        sys.exit(1 if errors else 0)
+    filepaths = args.files or sorted(glob.glob(LOCALE_FILES))
+
+    # Parcourir tous les fichiers JSON de langues
+    backup = BackupStore().begin("fix_json_locales")
+    counts = Counter(fix_json_file(filepath, backup) for filepath in filepaths)
+
+    print(f"\nRésumé: {len(filepaths)} fichiers traités, {counts['written']} corrigés et écrits, "
+          f"{counts['valid']} déjà valides, {counts['failed']} en échec")
+    if backup.files:
+        print(backup.summary())
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,6 @@
 #!/usr/bin/env python3
-import json
-import os
-import shutil
-
-# Définition des chemins
-LOCALES_DIR = "public/locales"
-LANGUAGES = ["en", "fr", "de", "es", "it"]
-
-# Fonction pour charger un fichier JSON
-def load_json(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Erreur lors du chargement de {file_path}: {e}")
-        return {}
-
-# Fonction pour sauvegarder un fichier JSON
-def save_json(file_path, data):
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+from locale_backup import BackupStore
+from locale_store import LOCALES_DIR, get_store
 
 # Corrections suggérées à partir de la vérification
 suggested_fixes = {
@@ -76,9 +56,11 @@ suggested_fixes = {
 def apply_fixes():
     print("Application des corrections suggérées aux fichiers de traduction...")
     
+    store = get_store(LOCALES_DIR)
+    backup = BackupStore().begin("fix_translations")
     for lang, fixes in suggested_fixes.items():
-        file_path = f"{LOCALES_DIR}/{lang}/common.json"
-        data = load_json(file_path)
+        file_path = store.path(lang, "common")
+        data = store.get(lang, "common")
         changes_made = 0
         
         for path, new_value in fixes.items():
@@ -105,15 +87,19 @@ def apply_fixes():
         
         if changes_made > 0:
             # Faire une sauvegarde avant de modifier
-            backup_path = f"{LOCALES_DIR}/backup/{lang}/common.json.fix"
-            os.makedirs(os.path.dirname(backup_path), exist_ok=True)
-            shutil.copy2(file_path, backup_path)
+            backup.add(file_path)
             
             # Sauvegarder les modifications
-            save_json(file_path, data)
+            store.mark_dirty(lang, "common")
             print(f"\nFichier {file_path} mis à jour avec {changes_made} corrections.")
         else:
             print(f"\nAucune correction appliquée pour {lang}.")
+    
+    # Seuls les fichiers réellement modifiés sont réécrits
+    written = store.save()
+    print(f"\n{len(written)} fichiers écrits.")
+    if backup.files:
+        print(backup.summary())
 
 def main():
     print("Correction des problèmes de traduction identifiés\n")
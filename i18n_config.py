@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# Réglages partagés par les outils i18n, sans autre dépendance pour pouvoir
+# être importés par tous les modules (y compris ceux que locale_store importe)
+
+# Emplacement par défaut des caches (ignoré par git)
+CACHE_DIR = ".i18n_cache"
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import os
+import re
+from collections import defaultdict
+
+from locale_store import LOCALES_DIR, LocaleStore
+
+# openpyxl n'est nécessaire que pour lire un classeur XLSX
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+REFERENCE_LANG = "en"
+DEFAULT_NAMESPACE = "translation"
+# En-têtes de colonnes de langue : "fr", ou "suggested_de" comme dans
+# german_missing_translations.xlsx
+LANG_COLUMN = re.compile(r'^(?:suggested_)?([a-z]{2}(?:-[A-Za-z]{2})?)$')
+
+# Lignes d'un audit CSV, TSV ou XLSX (lecture en flux, cellules en texte)
+def read_rows(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xlsx":
+        if load_workbook is None:
+            raise SystemExit("L'import XLSX nécessite openpyxl (pip install openpyxl)")
+        wb = load_workbook(path, read_only=True)
+        try:
+            for row in wb.active.iter_rows(values_only=True):
+                yield ["" if cell is None else str(cell) for cell in row]
+        finally:
+            wb.close()
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.reader(f, delimiter="\t" if extension == ".tsv" else ",")
+
+# Position des colonnes : namespace (facultative), clé et une colonne par langue
+def parse_header(header):
+    columns = {"namespace": None, "key": None, "langs": {}}
+    for i, title in enumerate(header):
+        title = title.strip()
+        if title in ("namespace", "key"):
+            columns[title] = i
+            continue
+        match = LANG_COLUMN.match(title)
+        if match:
+            columns["langs"][match.group(1)] = i
+    if columns["key"] is None:
+        raise SystemExit("Colonne 'key' introuvable dans l'en-tête")
+    return columns
+
+# Chemin imbriqué de chaque clé aplatie d'un fichier, pour les clés dont le
+# nom contient lui-même un point
+def key_paths(d):
+    paths = {}
+    stack = [((), d)]
+    while stack:
+        path, node = stack.pop()
+        for k, v in node.items():
+            if isinstance(v, dict):
+                stack.append((path + (k,), v))
+            else:
+                paths[".".join(path + (k,))] = path + (k,)
+    return paths
+
+# Modifications demandées par l'audit : {(langue, namespace): {clé: valeur}}
+# et conflits (langue, namespace, clé, raison). Seules les cellules
+# différentes du fichier actuel sont retenues ; une cellule vide n'efface rien.
+# Une clé absente de la référence en est un conflit : elle créerait une
+# nouvelle branche dans le fichier. Les valeurs en conflit ne sont retenues
+# qu'avec force=True. Les clés à segment vide (« . », « a..b ») inconnues de
+# la référence sont rejetées même avec force=True : (langue, namespace,
+# clé, raison) dans la troisième liste retournée.
+def build_patches(rows, store, langs=None, default_ns=DEFAULT_NAMESPACE, base_rows=None, force=False):
+    rows = iter(rows)
+    columns = parse_header(next(rows))
+    targets = [lang for lang in columns["langs"] if lang != REFERENCE_LANG and (not langs or lang in langs)]
+    base = {}
+    if base_rows is not None:
+        base_rows = iter(base_rows)
+        base_columns = parse_header(next(base_rows))
+        for row in base_rows:
+            ns, key = _row_key(row, base_columns, default_ns)
+            for lang, i in base_columns["langs"].items():
+                if i < len(row):
+                    base[(lang, ns, key)] = row[i]
+
+    patches = defaultdict(dict)
+    conflicts = []
+    rejected = []
+    flats = {}
+
+    def current(lang, ns):
+        if (lang, ns) not in flats:
+            flats[(lang, ns)] = store.flat(lang, ns) if ns in store.namespaces(lang) else {}
+        return flats[(lang, ns)]
+
+    for row in rows:
+        ns, key = _row_key(row, columns, default_ns)
+        if not key:
+            continue
+        reference = current(REFERENCE_LANG, ns)
+        if "" in key.split(".") and key not in reference:
+            rejected.extend((lang, ns, key, "segment de clé vide") for lang in targets
+                            if columns["langs"][lang] < len(row) and row[columns["langs"][lang]])
+            continue
+        # Texte source modifié depuis l'export : la traduction est peut-être périmée
+        ref_column = columns["langs"].get(REFERENCE_LANG)
+        stale_source = (
+            ref_column is not None and ref_column < len(row) and row[ref_column]
+            and reference.get(key) is not None and str(reference[key]) != row[ref_column]
+        )
+        for lang in targets:
+            i = columns["langs"][lang]
+            value = row[i] if i < len(row) else ""
+            if not value:
+                continue
+            existing = current(lang, ns).get(key)
+            if existing is not None and str(existing) == value:
+                continue
+            reason = None
+            if existing is not None and not isinstance(existing, str):
+                reason = "valeur non textuelle dans le fichier"
+            elif key not in reference:
+                reason = f"clé absente de la référence {REFERENCE_LANG}"
+            elif stale_source:
+                reason = "texte source modifié depuis l'export"
+            elif (lang, ns, key) in base and (existing or "") != base[(lang, ns, key)] \
+                    and value != base[(lang, ns, key)]:
+                reason = "valeur modifiée dans le fichier depuis l'export"
+            if reason:
+                conflicts.append((lang, ns, key, reason))
+                if not force:
+                    continue
+            patches[(lang, ns)][key] = value
+    return patches, conflicts, rejected
+
+def _row_key(row, columns, default_ns):
+    ns_column, key_column = columns["namespace"], columns["key"]
+    ns = row[ns_column] if ns_column is not None and ns_column < len(row) and row[ns_column] else default_ns
+    key = row[key_column] if key_column < len(row) else ""
+    return ns, key
+
+# Appliquer les modifications : chaque fichier est chargé une fois, modifié
+# en mémoire puis écrit une seule fois. Retourne le nombre de valeurs
+# appliquées par fichier et les clés impossibles à placer.
+def apply_patches(store, patches):
+    applied = {}
+    conflicts = []
+    for (lang, ns), values in sorted(patches.items()):
+        data = store.get(lang, ns)
+        paths = key_paths(data)
+        count = 0
+        for key, value in values.items():
+            path = paths.get(key, tuple(key.split(".")))
+            if "" in path:
+                conflicts.append((lang, ns, key, "segment de clé vide"))
+                continue
+            node = data
+            for part in path[:-1]:
+                node = node.setdefault(part, {})
+                if not isinstance(node, dict):
+                    break
+            if not isinstance(node, dict):
+                conflicts.append((lang, ns, key, "une valeur occupe déjà le chemin de la clé"))
+                continue
+            node[path[-1]] = value
+            count += 1
+        if count:
+            store.mark_dirty(lang, ns)
+            applied[store.path(lang, ns)] = count
+    return applied, conflicts
+
+def main():
+    parser = argparse.ArgumentParser(description="Import d'un audit de traductions (CSV, TSV ou XLSX) dans les fichiers JSON")
+    parser.add_argument("audit", help="fichier d'audit modifié par les traducteurs")
+    parser.add_argument("--locales", default=LOCALES_DIR, help=f"répertoire des locales (défaut: {LOCALES_DIR})")
+    parser.add_argument("--langs", nargs="+", help="langues à importer (défaut: toutes les colonnes sauf en)")
+    parser.add_argument("--ns", default=DEFAULT_NAMESPACE,
+                        help=f"namespace des audits sans colonne namespace (défaut: {DEFAULT_NAMESPACE})")
+    parser.add_argument("--base", help="audit d'origine, tel qu'exporté, pour détecter les fichiers modifiés depuis")
+    parser.add_argument("--force", action="store_true", help="appliquer aussi les valeurs en conflit")
+    parser.add_argument("--dry-run", action="store_true", help="afficher les modifications sans écrire")
+    args = parser.parse_args()
+
+    store = LocaleStore(args.locales)
+    base_rows = read_rows(args.base) if args.base else None
+    patches, conflicts, rejected = build_patches(read_rows(args.audit), store, args.langs, args.ns,
+                                       base_rows, args.force)
+    applied, misplaced = apply_patches(store, patches)
+    misplaced = rejected + misplaced
+
+    if conflicts:
+        print(f"=== CONFLITS ({len(conflicts)}) ===")
+        for lang, ns, key, reason in conflicts:
+            print(f"  - {lang}/{ns}: {key} ({reason})")
+        print("Valeurs en conflit appliquées (--force)." if args.force
+              else "Valeurs en conflit ignorées (--force pour les appliquer).")
+    if misplaced:
+        print(f"\n=== CLÉS IMPOSSIBLES À PLACER ({len(misplaced)}) ===")
+        for lang, ns, key, reason in misplaced:
+            print(f"  - {lang}/{ns}: {key} ({reason})")
+
+    print("\n=== MODIFICATIONS ===")
+    if not applied:
+        print("Aucune valeur à importer.")
+    for file_path, count in applied.items():
+        print(f"  - {file_path}: {count} valeurs")
+
+    if args.dry_run:
+        print("\nSimulation : aucun fichier écrit.")
+        return
+    written = store.save()
+    print(f"\n{len(written)} fichiers écrits.")
+
+if __name__ == "__main__":
+    main()
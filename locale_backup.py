@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from locale_store import write_if_changed
+
+# zstandard n'est nécessaire que pour la compression zstd (gzip sinon)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Emplacement par défaut des sauvegardes (ignoré par git)
+BACKUP_DIR = ".i18n_backups"
+EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+# Sauvegardes des fichiers de locales avant modification. Chaque contenu est
+# stocké une seule fois, compressé, sous son empreinte sha256
+# (objects/ab/abcd....gz) ; chaque exécution d'un outil écrit un manifeste
+# (runs/<run>.json) qui associe les chemins sauvegardés à leur empreinte.
+class BackupStore:
+    def __init__(self, backup_dir=BACKUP_DIR, compression=None):
+        if compression == "zstd" and zstandard is None:
+            raise SystemExit("La compression zstd nécessite zstandard (pip install zstandard)")
+        self.backup_dir = backup_dir
+        self.compression = compression or ("zstd" if zstandard is not None else "gzip")
+
+    def object_path(self, sha256, compression):
+        return os.path.join(self.backup_dir, "objects", sha256[:2], sha256 + EXTENSIONS[compression])
+
+    def run_path(self, run_id):
+        return os.path.join(self.backup_dir, "runs", run_id + ".json")
+
+    # Stocker un contenu ; un contenu déjà connu (quel que soit son format de
+    # compression) n'est pas réécrit. Retourne (empreinte, nouvel objet).
+    def put(self, content):
+        sha256 = hashlib.sha256(content).hexdigest()
+        if any(os.path.exists(self.object_path(sha256, c)) for c in EXTENSIONS):
+            return sha256, False
+        if self.compression == "zstd":
+            data = zstandard.ZstdCompressor(level=3).compress(content)
+        else:
+            data = gzip.compress(content, compresslevel=6, mtime=0)
+        write_if_changed(self.object_path(sha256, self.compression), data)
+        return sha256, True
+
+    def get(self, sha256):
+        for compression in EXTENSIONS:
+            path = self.object_path(sha256, compression)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            if compression == "gzip":
+                return gzip.decompress(data)
+            if zstandard is None:
+                raise SystemExit("La lecture des sauvegardes zstd nécessite zstandard (pip install zstandard)")
+            return zstandard.ZstdDecompressor().decompress(data)
+        raise KeyError(sha256)
+
+    # Nouvelle exécution : rien n'est écrit avant la première sauvegarde
+    def begin(self, tool):
+        return BackupRun(self, tool)
+
+    # Manifestes de toutes les exécutions, de la plus ancienne à la plus
+    # récente ; avec strict=True, un manifeste illisible arrête tout
+    def runs(self, strict=False):
+        runs_dir = os.path.join(self.backup_dir, "runs")
+        if not os.path.isdir(runs_dir):
+            return []
+        manifests = []
+        for name in sorted(os.listdir(runs_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(runs_dir, name), "r", encoding="utf-8") as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError) as e:
+                if strict:
+                    raise SystemExit(f"Manifeste illisible {name}: {e}")
+                print(f"Manifeste illisible {name}: {e}")
+        return manifests
+
+    def manifest(self, run_id):
+        try:
+            with open(self.run_path(run_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise SystemExit(f"Sauvegarde introuvable: {run_id}")
+
+    # Remettre les fichiers d'une exécution (tous, ou seulement paths) dans
+    # leur état d'avant ; retourne les chemins réellement réécrits (un
+    # fichier déjà dans cet état n'est pas touché)
+    def restore(self, run_id, paths=None):
+        files = self.manifest(run_id)["files"]
+        if paths:
+            paths = {os.path.normpath(p) for p in paths}
+            files = {p: sha256 for p, sha256 in files.items() if p in paths}
+        restored = []
+        for path, sha256 in sorted(files.items()):
+            if write_if_changed(path, self.get(sha256)):
+                restored.append(path)
+        return restored
+
+    # Garder les keep exécutions les plus récentes et/ou celles de moins de
+    # max_age_days jours, puis supprimer les objets qui ne sont plus
+    # référencés. Rien n'est supprimé si un manifeste est illisible (ses
+    # objets sembleraient orphelins) ; les fichiers temporaires d'une
+    # sauvegarde en cours sont laissés. Retourne (exécutions supprimées,
+    # objets supprimés).
+    def gc(self, keep=None, max_age_days=None):
+        runs = self.runs(strict=True)
+        removed = []
+        if keep is not None:
+            removed += runs[:max(len(runs) - keep, 0)]
+        if max_age_days is not None:
+            limit = time.time() - max_age_days * 86400
+            removed += [run for run in runs if run["created"] < limit and run not in removed]
+        for run in removed:
+            os.remove(self.run_path(run["run"]))
+        referenced = {sha256 for run in runs if run not in removed for sha256 in run["files"].values()}
+        objects = 0
+        objects_dir = os.path.join(self.backup_dir, "objects")
+        for root, _, names in os.walk(objects_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                if name.split(".")[0] not in referenced:
+                    os.remove(os.path.join(root, name))
+                    objects += 1
+        return len(removed), objects
+
+# Sauvegardes d'une exécution d'un outil ; le manifeste est réécrit après
+# chaque fichier, pour rester complet si l'outil s'interrompt
+class BackupRun:
+    def __init__(self, store, tool):
+        self.store = store
+        self.run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{tool}"
+        self.tool = tool
+        self.created = time.time()
+        self.files = {}
+        self.new_objects = 0
+
+    # Sauvegarder un fichier (ou le contenu déjà lu) avant de le modifier ;
+    # un fichier absent n'a rien à sauvegarder
+    def add(self, path, content=None):
+        if content is None:
+            try:
+                with open(path, "rb") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                return None
+        elif isinstance(content, str):
+            content = content.encode("utf-8")
+        path = os.path.normpath(path)
+        if path in self.files:
+            return self.files[path]
+        sha256, created = self.store.put(content)
+        self.new_objects += created
+        self.files[path] = sha256
+        manifest = {"run": self.run_id, "tool": self.tool, "created": self.created, "files": self.files}
+        write_if_changed(self.store.run_path(self.run_id),
+                         json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+        return sha256
+
+    def summary(self):
+        return (f"Sauvegarde {self.run_id}: {len(self.files)} fichiers, "
+                f"{self.new_objects} nouveaux contenus (restauration: python3 locale_backup.py restore {self.run_id})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sauvegardes des fichiers de locales")
+    parser.add_argument("--dir", default=BACKUP_DIR, help=f"répertoire des sauvegardes (défaut: {BACKUP_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="lister les exécutions sauvegardées")
+    show = commands.add_parser("show", help="fichiers d'une exécution")
+    show.add_argument("run")
+    restore = commands.add_parser("restore", help="restaurer les fichiers d'une exécution")
+    restore.add_argument("run")
+    restore.add_argument("paths", nargs="*", help="fichiers à restaurer (défaut: tous)")
+    gc = commands.add_parser("gc", help="supprimer les anciennes sauvegardes")
+    gc.add_argument("--keep", type=int, help="nombre d'exécutions récentes à garder")
+    gc.add_argument("--max-age", type=float, help="âge maximal des exécutions, en jours")
+    args = parser.parse_args()
+
+    store = BackupStore(args.dir)
+    if args.command == "list":
+        runs = store.runs()
+        if not runs:
+            print("Aucune sauvegarde.")
+        for run in runs:
+            print(f"{run['run']}  {len(run['files'])} fichiers")
+    elif args.command == "show":
+        for path, sha256 in sorted(store.manifest(args.run)["files"].items()):
+            print(f"{sha256[:12]}  {path}")
+    elif args.command == "restore":
+        restored = store.restore(args.run, args.paths)
+        for path in restored:
+            print(f"Restauré: {path}")
+        print(f"{len(restored)} fichiers restaurés (écrits).")
+    elif args.command == "gc":
+        if args.keep is None and args.max_age is None:
+            sys.exit("Préciser --keep et/ou --max-age")
+        runs, objects = store.gc(args.keep, args.max_age)
+        print(f"{runs} exécutions et {objects} contenus supprimés.")
+
+if __name__ == "__main__":
+    main()
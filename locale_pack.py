@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from i18n_config import CACHE_DIR
+from locale_store import LOCALES_DIR, LocaleStore, iter_flat, write_if_changed
+
+# Instantané binaire des fichiers de traduction (.locpack), lu par mmap sans
+# analyse JSON. Structure (entiers little-endian) :
+#   en-tête    : magic, version, nb de chaînes, première chaîne JSON,
+#                nb de langues, nb de namespaces, taille de la liste des
+#                sources
+#   sources    : liste JSON [chemin relatif, taille, date de modification
+#                (ns)] de chaque fichier source, complétée à 4 octets
+#   langues    : indices de chaînes (u32)
+#   namespaces : par namespace, indice du nom, nb de clés, position de la
+#                table des clés et de la table des valeurs (u64)
+#   chaînes    : nb de chaînes + 1 positions (u32), puis les données UTF-8
+#                mises bout à bout (la chaîne i va de offsets[i] à offsets[i+1])
+#   clés       : par namespace, indices de chaînes des clés triées (u32)
+#   valeurs    : par namespace et par langue, indice de chaîne de la valeur
+#                de chaque clé (u32), MISSING si la clé est absente
+# Les valeurs non textuelles (listes, nombres...) sont stockées en JSON, à
+# la fin de la table des chaînes.
+MAGIC = b"LOCPACK\0"
+VERSION = 2
+HEADER = struct.Struct("<8sIIIIII")
+NAMESPACE_ENTRY = struct.Struct("<IIQQ")
+MISSING = 0xFFFFFFFF
+PACK_PATH = os.path.join(CACHE_DIR, "locales.locpack")
+
+# Instantané associé à un répertoire de locales (un fichier par répertoire)
+def pack_path_for(locales_dir=LOCALES_DIR):
+    if os.path.normpath(locales_dir) == os.path.normpath(LOCALES_DIR):
+        return PACK_PATH
+    digest = hashlib.sha1(os.path.abspath(locales_dir).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"locales-{digest}.locpack")
+
+# Fichiers sources [chemin relatif, taille, date de modification (ns)],
+# triés : l'instantané n'est valable que pour exactement cette liste (un
+# fichier modifié puis antidaté change de taille ou de date, un fichier
+# supprimé ou ajouté change la liste)
+def source_files(locales_dir=LOCALES_DIR):
+    store = LocaleStore(locales_dir)
+    sources = []
+    for lang in store.languages():
+        for ns in store.namespaces(lang):
+            stat = os.stat(store.path(lang, ns))
+            sources.append([f"{lang}/{ns}.json", stat.st_size, stat.st_mtime_ns])
+    return sources
+
+# Écrire l'instantané de tous les fichiers <lang>/<ns>.json
+def build_pack(locales_dir=LOCALES_DIR, output_path=None):
+    output_path = output_path or pack_path_for(locales_dir)
+    store = LocaleStore(locales_dir)
+    languages = store.languages()
+    present = {lang: store.namespaces(lang) for lang in languages}
+    namespaces = sorted({ns for lang in languages for ns in present[lang]})
+    # Liste relevée avant la lecture : un fichier modifié pendant la
+    # construction rend l'instantané périmé plutôt que faux
+    sources = json.dumps(source_files(locales_dir)).encode("utf-8")
+    sources += b" " * (-len(sources) % 4)
+
+    strings = {}
+    values = {}
+
+    def string_id(value):
+        return strings.setdefault(value, len(strings))
+
+    # Les valeurs JSON sont numérotées à part, puis placées après les chaînes
+    def value_id(value):
+        if isinstance(value, str):
+            return string_id(value)
+        return -1 - values.setdefault(json.dumps(value, ensure_ascii=False), len(values))
+
+    lang_ids = [string_id(lang) for lang in languages]
+    tables = []
+    for ns in namespaces:
+        flats = {lang: dict(iter_flat(store.get(lang, ns))) if ns in present[lang] else {}
+                 for lang in languages}
+        keys = sorted(set().union(*flats.values()))
+        key_ids = [string_id(key) for key in keys]
+        value_ids = []
+        for lang in languages:
+            flat = flats[lang]
+            value_ids.extend(value_id(flat[key]) if key in flat else MISSING for key in keys)
+        tables.append((string_id(ns), key_ids, value_ids))
+
+    json_start = len(strings)
+    for ns_index, (name_id, key_ids, value_ids) in enumerate(tables):
+        value_ids = [json_start - 1 - i if i < 0 else i for i in value_ids]
+        tables[ns_index] = (name_id, key_ids, value_ids)
+    encoded = [value.encode("utf-8") for value in strings]
+    encoded.extend(value.encode("utf-8") for value in values)
+
+    header_size = HEADER.size + len(sources) + 4 * len(languages) + NAMESPACE_ENTRY.size * len(namespaces)
+    data_start = header_size + 4 * (len(encoded) + 1)
+    offsets = [data_start]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    # Aligner les tables d'entiers sur 4 octets pour memoryview.cast
+    tables_start = (offsets[-1] + 3) & ~3
+
+    entries = []
+    position = tables_start
+    for name_id, key_ids, value_ids in tables:
+        entries.append(NAMESPACE_ENTRY.pack(name_id, len(key_ids), position, position + 4 * len(key_ids)))
+        position += 4 * (len(key_ids) + len(value_ids))
+
+    chunks = [
+        HEADER.pack(MAGIC, VERSION, len(encoded), json_start, len(languages), len(namespaces), len(sources)),
+        sources,
+        struct.pack(f"<{len(lang_ids)}I", *lang_ids),
+        b"".join(entries),
+        struct.pack(f"<{len(offsets)}I", *offsets),
+        b"".join(encoded),
+        b"\0" * (tables_start - offsets[-1]),
+    ]
+    for _, key_ids, value_ids in tables:
+        chunks.append(struct.pack(f"<{len(key_ids)}I", *key_ids))
+        chunks.append(struct.pack(f"<{len(value_ids)}I", *value_ids))
+    write_if_changed(output_path, b"".join(chunks))
+    return output_path
+
+# Instantané ouvert par mmap : les chaînes ne sont décodées qu'à la demande
+class LocalePack:
+    def __init__(self, path=PACK_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, n_strings, self._json_start, n_langs, n_ns, sources_size = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{path}: format .locpack inconnu")
+        self._view = view
+        position = HEADER.size
+        self.sources = json.loads(self._mmap[position:position + sources_size].decode("utf-8"))
+        self._files = {relpath for relpath, _, _ in self.sources}
+        position += sources_size
+        offsets_at = position + 4 * n_langs + NAMESPACE_ENTRY.size * n_ns
+        self._offsets = view[offsets_at:offsets_at + 4 * (n_strings + 1)].cast("I")
+        self.languages = [self.string(i) for i in view[position:position + 4 * n_langs].cast("I")]
+        self._lang_index = {lang: i for i, lang in enumerate(self.languages)}
+        position += 4 * n_langs
+        self._namespaces = {}
+        for _ in range(n_ns):
+            name_id, n_keys, keys_at, values_at = NAMESPACE_ENTRY.unpack_from(view, position)
+            position += NAMESPACE_ENTRY.size
+            keys = view[keys_at:keys_at + 4 * n_keys].cast("I")
+            values = view[values_at:values_at + 4 * n_keys * n_langs].cast("I")
+            self._namespaces[self.string(name_id)] = (n_keys, keys, values)
+        self._sorted_keys = {}
+
+    @property
+    def namespaces(self):
+        return list(self._namespaces)
+
+    def string(self, index):
+        return self._mmap[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    # Valeur d'une cellule (texte, ou valeur JSON décodée)
+    def value(self, index):
+        if index >= self._json_start:
+            return json.loads(self.string(index))
+        return self.string(index)
+
+    # Décoder plusieurs valeurs d'un coup (MISSING donne None)
+    def values(self, indices):
+        data = self._mmap
+        offsets = self._offsets
+        json_start = self._json_start
+        result = []
+        append = result.append
+        for index in indices:
+            if index < json_start:
+                append(data[offsets[index]:offsets[index + 1]].decode("utf-8"))
+            elif index == MISSING:
+                append(None)
+            else:
+                append(self.value(index))
+        return result
+
+    # Vrai si le fichier <lang>/<ns>.json existait à la construction
+    def has(self, lang, ns):
+        return f"{lang}/{ns}.json" in self._files
+
+    # Clés triées d'un namespace (décodées et internées une seule fois)
+    def keys(self, ns):
+        if ns not in self._sorted_keys:
+            _, keys, _ = self._namespaces[ns]
+            self._sorted_keys[ns] = list(map(sys.intern, self.values(keys)))
+        return self._sorted_keys[ns]
+
+    # Indices des valeurs d'une langue, alignés sur keys(ns) (MISSING si absente)
+    def value_ids(self, lang, ns):
+        n_keys, _, values = self._namespaces[ns]
+        base = self._lang_index[lang] * n_keys
+        return values[base:base + n_keys]
+
+    # Valeur d'une clé : recherche dichotomique sur les clés triées
+    def get(self, lang, ns, key, default=None):
+        n_keys, keys, values = self._namespaces[ns]
+        low, high = 0, n_keys
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(keys[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == n_keys or self.string(keys[low]) != key:
+            return default
+        value_id = values[self._lang_index[lang] * n_keys + low]
+        return default if value_id == MISSING else self.value(value_id)
+
+    # Paires (clé, valeur) présentes d'une langue, dans l'ordre des clés
+    def items(self, lang, ns):
+        value_ids = self.value_ids(lang, ns)
+        for key, value_id, value in zip(self.keys(ns), value_ids, self.values(value_ids)):
+            if value_id != MISSING:
+                yield key, value
+
+    def close(self):
+        for _, keys, values in self._namespaces.values():
+            keys.release()
+            values.release()
+        self._offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+# Ouvrir l'instantané seulement si les sources (chemins, tailles et dates)
+# sont exactement celles de sa construction
+def load_pack_if_fresh(locales_dir=LOCALES_DIR, pack_path=None):
+    pack_path = pack_path or pack_path_for(locales_dir)
+    if not os.path.exists(pack_path):
+        return None
+    try:
+        pack = LocalePack(pack_path)
+    except (OSError, ValueError):
+        return None
+    if pack.sources != source_files(locales_dir):
+        pack.close()
+        return None
+    return pack
+
+def main():
+    parser = argparse.ArgumentParser(description="Instantané binaire des fichiers de traduction")
+    parser.add_argument("--locales", default=LOCALES_DIR, help=f"répertoire des locales (défaut: {LOCALES_DIR})")
+    parser.add_argument("--pack", help=f"fichier .locpack (défaut: {PACK_PATH} pour {LOCALES_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="écrire l'instantané à partir des fichiers JSON")
+    query = subparsers.add_parser("get", help="lire une valeur dans l'instantané")
+    query.add_argument("lang")
+    query.add_argument("ns")
+    query.add_argument("key")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        path = build_pack(args.locales, args.pack)
+        print(f"Instantané écrit: {path} ({os.path.getsize(path)} octets)")
+        return
+    pack = load_pack_if_fresh(args.locales, args.pack)
+    if pack is None:
+        print(f"Instantané absent ou différent des fichiers de {args.locales}, relancer 'build'")
+        sys.exit(1)
+    value = pack.get(args.lang, args.ns, args.key)
+    print(value if value is not None else f"Clé introuvable: {args.key}")
+
+if __name__ == "__main__":
+    main()
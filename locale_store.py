@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+
+from parse_cache import default_parse_cache
+
+# Définition des chemins
+LOCALES_DIR = "public/locales"
+LANGUAGES = ["en", "fr", "de", "es", "it"]
+NAMESPACES = ["common", "translation", "demo", "privacy"]
+
+# Cache des fichiers JSON déjà analysés (voir parse_cache.py), partagé par
+# tous les scripts d'un même répertoire de travail
+_parse_cache = default_parse_cache()
+
+# Remplacer le cache d'analyse (None le désactive)
+def set_parse_cache(cache):
+    global _parse_cache
+    _parse_cache = cache
+
+# Fonction pour charger un fichier JSON
+def load_json(file_path, quiet=False):
+    try:
+        if _parse_cache is not None:
+            return _parse_cache.load(file_path)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        if not quiet:
+            print(f"Erreur lors du chargement de {file_path}: {e}")
+        return {}
+
+# Écrire un fichier seulement si son contenu change : un fichier identique
+# garde sa date de modification (pas de rechargement HMR de Vite/i18next).
+# L'écriture passe par un fichier temporaire synchronisé sur le disque puis
+# renommé : le fichier n'est jamais vu tronqué. Retourne True si écrit.
+def write_if_changed(file_path, content):
+    try:
+        if os.path.getsize(file_path) == len(content):
+            with open(file_path, 'rb') as f:
+                if f.read() == content:
+                    return False
+    except OSError:
+        pass
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    # Le renommage lui-même doit survivre à une coupure (POSIX seulement)
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(directory or '.', os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return True
+
+# Fonction pour sauvegarder un fichier JSON ; retourne True si le fichier a
+# été réellement écrit
+def save_json(file_path, data):
+    content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return write_if_changed(file_path, content)
+
+# Parcours itératif d'un dictionnaire imbriqué : produit les paires
+# (clé pointée, valeur) dans l'ordre du fichier, avec une pile explicite
+# (aucune limite de récursion). Les clés sont internées : toutes les langues
+# partagent le même objet chaîne pour une même clé.
+def iter_flat(d, prefix=''):
+    intern = sys.intern
+    stack = [(prefix, iter(d.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            if isinstance(v, dict):
+                stack.append((prefix + k + '.', iter(v.items())))
+                break
+            yield intern(prefix + k), v
+        else:
+            stack.pop()
+
+# Même parcours, mais dans l'ordre trié des clés pointées : chaque niveau est
+# trié séparément (une sous-section « a » est classée comme « a. »), ce qui
+# donne l'ordre de sorted() sur les clés aplaties tant que les noms de clés
+# ne contiennent pas eux-mêmes de point
+def _sorted_items(d):
+    return iter(sorted(d.items(), key=lambda item: item[0] + '.' if isinstance(item[1], dict) else item[0]))
+
+def iter_sorted_flat(d, prefix=''):
+    intern = sys.intern
+    stack = [(prefix, _sorted_items(d))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            if isinstance(v, dict):
+                stack.append((prefix + k + '.', _sorted_items(v)))
+                break
+            yield intern(prefix + k), v
+        else:
+            stack.pop()
+
+# Fonction pour aplatir un dictionnaire imbriqué en clés pointées
+# (même parcours que iter_flat, mais remplit directement le dictionnaire)
+def flatten(d, prefix=''):
+    intern = sys.intern
+    r = {}
+    stack = [(prefix, iter(d.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            if isinstance(v, dict):
+                stack.append((prefix + k + '.', iter(v.items())))
+                break
+            r[intern(prefix + k)] = v
+        else:
+            stack.pop()
+    return r
+
+# Magasin partagé des fichiers de traduction : chaque fichier <lang>/<ns>.json
+# n'est lu qu'une seule fois par processus, quel que soit le nombre de
+# vérifications qui l'utilisent.
+class LocaleStore:
+    def __init__(self, locales_dir=LOCALES_DIR, quiet=False):
+        self.locales_dir = locales_dir
+        self.quiet = quiet
+        self._data = {}
+        self._flat = {}
+        self._dirty = set()
+        # Instantané .locpack éventuel (voir locale_pack.py)
+        self.pack = None
+
+    # Utiliser l'instantané binaire du répertoire s'il a été construit à
+    # partir des fichiers actuels ; retourne True si l'instantané est utilisé
+    def use_pack(self, pack_path=None):
+        from locale_pack import load_pack_if_fresh
+        self.pack = load_pack_if_fresh(self.locales_dir, pack_path)
+        return self.pack is not None
+
+    # Vrai si la vue aplatie peut être lue dans l'instantané (fichier non
+    # modifié depuis)
+    def packed(self, lang, ns="common"):
+        return self.pack is not None and not self.is_dirty(lang, ns) and self.pack.has(lang, ns)
+
+    def path(self, lang, ns="common"):
+        return os.path.join(self.locales_dir, lang, f"{ns}.json")
+
+    # Langues présentes sur le disque (le dossier backup est ignoré)
+    def languages(self):
+        if not os.path.isdir(self.locales_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.locales_dir)
+            if name != "backup" and os.path.isdir(os.path.join(self.locales_dir, name))
+        )
+
+    # Espaces de noms présents pour une langue
+    def namespaces(self, lang):
+        lang_dir = os.path.join(self.locales_dir, lang)
+        if not os.path.isdir(lang_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(lang_dir) if name.endswith(".json"))
+
+    # Vue imbriquée (chargée à la première demande, puis gardée en mémoire)
+    def get(self, lang, ns="common"):
+        if (lang, ns) not in self._data:
+            self._data[(lang, ns)] = load_json(self.path(lang, ns), quiet=self.quiet)
+        return self._data[(lang, ns)]
+
+    # Vue aplatie {"section.cle": valeur}, recalculée seulement après modification
+    def flat(self, lang, ns="common"):
+        if (lang, ns) not in self._flat:
+            if self.packed(lang, ns):
+                self._flat[(lang, ns)] = dict(self.pack.items(lang, ns))
+            else:
+                self._flat[(lang, ns)] = flatten(self.get(lang, ns))
+        return self._flat[(lang, ns)]
+
+    # Remplacer complètement le contenu d'un fichier
+    def set(self, lang, ns, data):
+        self._data[(lang, ns)] = data
+        self.mark_dirty(lang, ns)
+
+    # Signaler qu'un fichier a été modifié en place
+    def mark_dirty(self, lang, ns="common"):
+        self._dirty.add((lang, ns))
+        self._flat.pop((lang, ns), None)
+
+    # Oublier un fichier pour qu'il soit relu à la prochaine demande
+    # (modifié sur le disque par un autre outil, l'instantané n'est donc
+    # plus à jour)
+    def invalidate(self, lang, ns="common"):
+        self.pack = None
+        self._data.pop((lang, ns), None)
+        self._flat.pop((lang, ns), None)
+        self._dirty.discard((lang, ns))
+
+    def is_dirty(self, lang, ns="common"):
+        return (lang, ns) in self._dirty
+
+    # Fusion section par section (priorité aux nouvelles valeurs).
+    # Retourne le nombre de valeurs réellement modifiées.
+    def merge(self, lang, ns, content):
+        data = self.get(lang, ns)
+        changes = 0
+        for section, values in content.items():
+            if not isinstance(data.get(section), dict):
+                data[section] = {}
+                changes += 1
+            target = data[section]
+            for key, value in values.items():
+                if target.get(key) != value:
+                    target[key] = value
+                    changes += 1
+        if changes:
+            self.mark_dirty(lang, ns)
+        return changes
+
+    # Écrire uniquement les fichiers modifiés dont le contenu sur le disque
+    # change ; retourne les chemins réellement écrits
+    def save(self):
+        written = []
+        for lang, ns in sorted(self._dirty):
+            file_path = self.path(lang, ns)
+            if save_json(file_path, self._data[(lang, ns)]):
+                written.append(file_path)
+        self._dirty.clear()
+        if written:
+            self.pack = None
+        return written
+
+# Magasins partagés par répertoire, pour que tous les modules d'un même
+# processus réutilisent les fichiers déjà chargés
+_stores = {}
+
+# La verbosité est celle du dernier appel : un script silencieux ne rend pas
+# muets les scripts suivants qui partagent le même magasin
+def get_store(locales_dir=LOCALES_DIR, quiet=False):
+    if locales_dir not in _stores:
+        _stores[locales_dir] = LocaleStore(locales_dir, quiet=quiet)
+    store = _stores[locales_dir]
+    store.quiet = quiet
+    return store
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import marshal
+import os
+import sys
+
+from i18n_config import CACHE_DIR
+
+# Emplacement et taille par défaut du cache des fichiers JSON analysés ;
+# I18N_PARSE_CACHE_DIR change le répertoire ("off" désactive le cache),
+# I18N_PARSE_CACHE_MB la taille maximale
+PARSE_CACHE_DIR = os.path.join(CACHE_DIR, "parsed")
+PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Cache des arbres JSON analysés, sérialisés avec marshal. Une entrée est
+# identifiée par le chemin du fichier et l'empreinte sha256 de son contenu :
+# un fichier modifié est donc toujours relu. Au-delà de max_bytes, les
+# entrées les moins récemment utilisées (date de modification, mise à jour
+# à chaque lecture) sont supprimées.
+class ParseCache:
+    def __init__(self, cache_dir=PARSE_CACHE_DIR, max_bytes=PARSE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    # Le format marshal dépend de la version de Python
+    def entry_path(self, file_path, sha256):
+        key = f"{sys.version_info[0]}.{sys.version_info[1]}\0{os.path.abspath(file_path)}\0{sha256}"
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".marshal")
+
+    # Charger un fichier JSON, depuis le cache si son contenu est connu
+    # (les erreurs de lecture et d'analyse sont celles de json.load)
+    def load(self, file_path):
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        entry = self.entry_path(file_path, hashlib.sha256(content).hexdigest())
+        try:
+            with open(entry, 'rb') as f:
+                data = marshal.loads(f.read())
+            os.utime(entry)
+            self.hits += 1
+            return data
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        data = json.loads(content.decode('utf-8'))
+        self.misses += 1
+        self.store(entry, data)
+        return data
+
+    # Écriture via un fichier temporaire, sans fsync : une entrée perdue
+    # lors d'une coupure est simplement recalculée. Un cache en lecture
+    # seule ou plein n'empêche jamais le chargement.
+    def store(self, entry, data):
+        temp_path = f"{entry}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                marshal.dump(data, f)
+            os.replace(temp_path, entry)
+            self.evict()
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # Supprimer les entrées les plus anciennes au-delà de la taille maximale
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".marshal"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    # Vider complètement le cache
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".marshal"):
+                os.remove(entry.path)
+
+# Cache par défaut du processus, configuré par les variables d'environnement
+def default_parse_cache():
+    cache_dir = os.environ.get("I18N_PARSE_CACHE_DIR", PARSE_CACHE_DIR)
+    if cache_dir.lower() in ("", "off", "0"):
+        return None
+    max_mb = os.environ.get("I18N_PARSE_CACHE_MB")
+    max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else PARSE_CACHE_MAX_BYTES
+    return ParseCache(cache_dir, max_bytes)
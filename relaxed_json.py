@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+import json
+import re
+from json.decoder import scanstring
+
+# Analyseur JSON tolérant, en une seule passe : accepte les clés sans
+# guillemets, les virgules en trop ou manquantes, les valeurs sans
+# guillemets, les chaînes entre apostrophes, les commentaires et les
+# accolades non fermées. Chaque correction est notée avec sa ligne et sa
+# colonne ; le résultat est un arbre Python ordinaire, à réécrire en JSON
+# canonique avec json.dump.
+WHITESPACE = re.compile('[ \t\n\r]*')
+NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?')
+# Clé sans guillemets : tout jusqu'au ':' (ou à un séparateur)
+BARE_KEY = re.compile(r'[^\s:,{}\[\]"\'/]+')
+# Valeur sans guillemets : jusqu'au séparateur suivant, espaces internes compris
+BARE_VALUE = re.compile(r'[^\s,{}\[\]"\'/:](?:[^,{}\[\]\n"]*[^\s,{}\[\]\n"])?')
+LITERALS = {
+    "true": (True, None), "false": (False, None), "null": (None, None),
+    "True": (True, "True remplacé par true"), "False": (False, "False remplacé par false"),
+    "None": (None, "None remplacé par null"),
+}
+
+# NaN et Infinity, acceptés par le module json, ne sont pas du JSON valide
+def _reject_constant(name):
+    raise ValueError(f"constante {name} non valide en JSON")
+
+DECODER = json.JSONDecoder(parse_constant=_reject_constant)
+# Suite de membres simples ("clé": "valeur", nombre, true, false ou null),
+# chacun suivi d'une virgule, jusqu'à une autre clé entre guillemets : dans
+# les objets analysés en Python, toute la suite est reconnue par une seule
+# expression régulière puis décodée par l'analyseur C
+SIMPLE_RUN = re.compile(
+    r'(?:"[^"\\\x00-\x1f]*"[ \t\n\r]*:[ \t\n\r]*'
+    r'(?:"[^"\\\x00-\x1f]*"|-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null)'
+    r'[ \t\n\r]*,[ \t\n\r]*)+(?=")')
+# Au-delà de SCAN_FAILURES échecs de l'analyseur C, s'ils représentent plus
+# d'un essai sur SCAN_FAILURE_RATIO, les erreurs sont trop denses et le reste
+# du texte est analysé en Python
+SCAN_FAILURES = 16
+SCAN_FAILURE_RATIO = 4
+
+class RelaxedJSONError(ValueError):
+    def __init__(self, msg, lineno, colno):
+        super().__init__(f"{msg}: ligne {lineno} colonne {colno}")
+        self.lineno = lineno
+        self.colno = colno
+
+class _Parser:
+    def __init__(self, text, targeted=True):
+        self.text = text
+        self.n = len(text)
+        self.repairs = []
+        self._last_location = (0, 1)
+        # Analyseur C du module json, essayé d'abord sur chaque objet ou
+        # tableau : seuls les conteneurs qui mènent à une erreur sont
+        # parcourus en Python
+        self.scan_once = DECODER.scan_once if targeted else None
+        # Chaque échec de l'analyseur C coûte une relecture du conteneur
+        # jusqu'à l'erreur et le calcul de sa ligne
+        self.scan_attempts = 0
+        self.scan_failures = 0
+
+    # Ligne et colonne (à partir de 1) d'une position ; les retours à la
+    # ligne sont comptés depuis la correction précédente (les corrections
+    # arrivent presque toujours dans l'ordre du texte)
+    def location(self, pos):
+        text = self.text
+        last_pos, last_line = self._last_location
+        if pos >= last_pos:
+            line = last_line + text.count('\n', last_pos, pos)
+        else:
+            line = last_line - text.count('\n', pos, last_pos)
+        self._last_location = pos, line
+        return line, pos - text.rfind('\n', 0, pos)
+
+    def repair(self, pos, message):
+        line, column = self.location(pos)
+        self.repairs.append((line, column, message))
+
+    # Espaces et commentaires (// et /* */, supprimés)
+    def skip(self, pos):
+        text = self.text
+        while True:
+            pos = WHITESPACE.match(text, pos).end()
+            if pos >= self.n or text[pos] != '/':
+                return pos
+            if text.startswith('//', pos):
+                self.repair(pos, "commentaire supprimé")
+                end = text.find('\n', pos)
+                pos = self.n if end < 0 else end
+            elif text.startswith('/*', pos):
+                self.repair(pos, "commentaire supprimé")
+                end = text.find('*/', pos + 2)
+                pos = self.n if end < 0 else end + 2
+            else:
+                return pos
+
+    def string(self, pos):
+        text = self.text
+        if text[pos] == "'":
+            return self.quoted(pos)
+        chunks = []
+        start = pos + 1
+        strict = True
+        while True:
+            try:
+                value, end = scanstring(text, start, strict)
+                return "".join(chunks) + value, end
+            except json.JSONDecodeError as e:
+                error = e
+            # Échappement invalide (\q, \u12zz) : la barre oblique est gardée
+            # telle quelle et la lecture reprend dans la même chaîne
+            if error.msg.startswith("Invalid \\"):
+                backslash = text.rfind('\\', start, error.pos + 1)
+                self.repair(backslash, "échappement invalide conservé tel quel")
+                chunks.append(scanstring(text[start:backslash] + '"', 0, strict)[0] + '\\')
+                start = backslash + 1
+                continue
+            # Un retour à la ligne dans une chaîne signale plutôt un guillemet
+            # fermant oublié qu'un caractère de contrôle
+            if error.msg.startswith("Invalid control character") and text[error.pos] not in '\r\n' and strict:
+                self.repair(error.pos, "caractère de contrôle dans une chaîne")
+                strict = False
+                continue
+            # Chaîne non terminée : elle s'arrête à la fin de la ligne
+            end = text.find('\n', pos)
+            end = self.n if end < 0 else end
+            self.repair(pos, "guillemet fermant manquant ajouté")
+            rest = text[start:end] if end > start else ""
+            return ("".join(chunks) + rest).rstrip().rstrip(','), end
+
+    # Chaîne entre apostrophes
+    def quoted(self, pos):
+        self.repair(pos, "apostrophes remplacées par des guillemets")
+        text = self.text
+        chars = []
+        i = pos + 1
+        while i < self.n and text[i] != "'":
+            if text[i] == '\\' and i + 1 < self.n:
+                escaped = text[i:i + 2]
+                chars.append("'" if escaped == "\\'" else json.loads(f'"{escaped}"') if escaped[1] in 'bfnrt"\\/' else escaped)
+                i += 2
+                continue
+            chars.append(text[i])
+            i += 1
+        if i >= self.n:
+            self.repair(pos, "apostrophe fermante manquante ajoutée")
+        return "".join(chars), i + 1
+
+    def key(self, pos):
+        if pos < self.n and self.text[pos] in '"\'':
+            return self.string(pos)
+        match = BARE_KEY.match(self.text, pos)
+        if match is None:
+            self.repair(pos, "clé manquante (chaîne vide)")
+            return "", pos
+        self.repair(pos, "guillemets ajoutés à la clé")
+        return match.group(), match.end()
+
+    def value(self, pos):
+        text = self.text
+        if pos >= self.n:
+            self.repair(pos, "valeur manquante (null)")
+            return None, pos
+        c = text[pos]
+        if c in '{[' and self.scan_once is not None:
+            self.scan_attempts += 1
+            try:
+                return self.scan_once(text, pos)
+            except (ValueError, StopIteration):
+                self.scan_failures += 1
+                if self.scan_failures > SCAN_FAILURES \
+                        and self.scan_failures * SCAN_FAILURE_RATIO > self.scan_attempts:
+                    self.scan_once = None
+        if c == '{':
+            return self.object(pos + 1)
+        if c == '[':
+            return self.array(pos + 1)
+        if c in '"\'':
+            return self.string(pos)
+        if c in '-0123456789':
+            match = NUMBER.match(text, pos)
+            if match:
+                end = match.end()
+                # Un nombre suivi de lettres (« 1st ») est une valeur sans guillemets
+                if end >= self.n or text[end] in ' \t\r\n,}]/':
+                    number = match.group()
+                    return (float(number) if any(ch in number for ch in '.eE') else int(number)), end
+        if c in ',}]:':
+            self.repair(pos, "valeur manquante (null)")
+            return None, pos
+        match = BARE_VALUE.match(text, pos)
+        if match is None:
+            self.repair(pos, f"caractère inattendu {c!r} ignoré")
+            return self.value(self.skip(pos + 1))
+        word = match.group()
+        if word in LITERALS:
+            value, message = LITERALS[word]
+            if message:
+                self.repair(pos, message)
+            return value, match.end()
+        self.repair(pos, "guillemets ajoutés à la valeur")
+        return word, match.end()
+
+    # Séparateur entre deux éléments ; retourne (position, fin du conteneur)
+    def separator(self, pos, closing):
+        text = self.text
+        if pos < self.n and text[pos] == ',':
+            comma = pos
+            pos = self.skip(pos + 1)
+            while pos < self.n and text[pos] == ',':
+                self.repair(pos, "virgule en trop supprimée")
+                pos = self.skip(pos + 1)
+            if pos < self.n and text[pos] == closing:
+                self.repair(comma, "virgule finale supprimée")
+                return pos + 1, True
+            return pos, False
+        if pos < self.n and text[pos] == closing:
+            return pos + 1, True
+        # Fin du texte ou mauvais fermant : traités par le conteneur
+        if pos >= self.n or text[pos] in '}]':
+            return pos, False
+        # « ["a": "b"] » : membre d'objet écrit dans un tableau
+        if closing == ']' and text[pos] == ':':
+            self.repair(pos, "':' remplacé par ','")
+            pos = self.skip(pos + 1)
+            if pos < self.n and text[pos] == ']':
+                return pos + 1, True
+            return pos, False
+        self.repair(pos, "virgule manquante ajoutée")
+        return pos, False
+
+    def object(self, pos):
+        text = self.text
+        result = {}
+        pos = self.skip(pos)
+        while pos < self.n and text[pos] == ',':
+            self.repair(pos, "virgule en trop supprimée")
+            pos = self.skip(pos + 1)
+        if pos < self.n and text[pos] == '}':
+            return result, pos + 1
+        while True:
+            match = SIMPLE_RUN.match(text, pos)
+            if match:
+                result.update(DECODER.decode('{' + text[pos:match.end()].rstrip()[:-1] + '}'))
+                pos = match.end()
+            if pos >= self.n:
+                self.repair(pos, "accolade fermante manquante ajoutée")
+                return result, pos
+            if text[pos] == ']':
+                self.repair(pos, "']' remplacé par '}'")
+                return result, pos + 1
+            key, pos = self.key(pos)
+            pos = self.skip(pos)
+            if pos < self.n and text[pos] in ':=':
+                if text[pos] == '=':
+                    self.repair(pos, "'=' remplacé par ':'")
+                pos = self.skip(pos + 1)
+            else:
+                self.repair(pos, "':' manquant ajouté")
+            value, pos = self.value(pos)
+            result[key] = value
+            pos, closed = self.separator(self.skip(pos), '}')
+            if closed:
+                return result, pos
+
+    def array(self, pos):
+        text = self.text
+        result = []
+        pos = self.skip(pos)
+        while pos < self.n and text[pos] == ',':
+            self.repair(pos, "virgule en trop supprimée")
+            pos = self.skip(pos + 1)
+        if pos < self.n and text[pos] == ']':
+            return result, pos + 1
+        while True:
+            if pos >= self.n:
+                self.repair(pos, "crochet fermant manquant ajouté")
+                return result, pos
+            if text[pos] == '}':
+                self.repair(pos, "'}' remplacé par ']'")
+                return result, pos + 1
+            # value() ne consomme pas un ':' isolé : sans cela, la boucle
+            # n'avancerait plus
+            if text[pos] == ':':
+                self.repair(pos, "':' inattendu supprimé")
+                pos = self.skip(pos + 1)
+                if pos < self.n and text[pos] == ']':
+                    return result, pos + 1
+                continue
+            value, pos = self.value(pos)
+            result.append(value)
+            pos, closed = self.separator(self.skip(pos), ']')
+            if closed:
+                return result, pos
+
+    def document(self):
+        pos = 0
+        # Un BOM UTF-8 est refusé par json.loads et par i18next : il est retiré
+        if self.text.startswith('\ufeff'):
+            self.repair(0, "BOM supprimé")
+            pos = 1
+        pos = self.skip(pos)
+        if pos >= self.n:
+            line, column = self.location(pos)
+            raise RelaxedJSONError("Document vide", line, column)
+        value, pos = self.value(pos)
+        pos = self.skip(pos)
+        if pos < self.n:
+            self.repair(pos, "contenu après la fin du document ignoré")
+        return value
+
+# Analyser un texte JSON éventuellement invalide : retourne (valeur,
+# corrections), chaque correction étant (ligne, colonne, message).
+# Avec targeted=True, les conteneurs valides sont relus par l'analyseur C à
+# partir de leur position : seuls les conteneurs qui mènent à une erreur
+# sont parcourus en Python, par suites de membres simples. Au-delà de
+# quelques erreurs par conteneur, tout le reste est analysé en Python.
+def parse_relaxed(text, targeted=True):
+    parser = _Parser(text, targeted)
+    return parser.document(), parser.repairs
+
+# Chemin rapide : un document valide est lu par json.loads (aucune correction)
+def loads_relaxed(text):
+    try:
+        return DECODER.decode(text), []
+    except ValueError:
+        return parse_relaxed(text)
@@ -0,0 +1,52 @@
+import export_translation_audit
+from export_translation_audit import audit_rows, matrix_rows, merge_rows, stream_rows
+from locale_store import LocaleStore, iter_sorted_flat, save_json
+
+
+def test_merge_rows_aligns_languages_on_sorted_keys():
+    en = iter_sorted_flat({"b": "B", "a": {"x": "AX"}})
+    fr = iter_sorted_flat({"a": {"x": "FX", "y": "FY"}})
+    assert list(merge_rows([en, fr])) == [
+        ("a.x", ["AX", "FX"]),
+        ("a.y", [None, "FY"]),
+        ("b", ["B", None]),
+    ]
+
+
+def test_merge_rows_never_compares_values_of_duplicate_keys():
+    # "a.b" en clé pointée et en objet imbriqué : même clé aplatie, valeurs
+    # de types différents
+    en = iter_sorted_flat({"a.b": "texte", "a": {"b": ["liste"]}})
+    fr = iter_sorted_flat({"a": {"b": {"c": 1}}})
+    rows = list(merge_rows([en, fr]))
+    assert [key for key, _ in rows] == ["a.b", "a.b.c"]
+
+
+def test_stream_rows_match_matrix_rows_and_leave_the_store_empty(tmp_path):
+    locales = str(tmp_path)
+    save_json(f"{locales}/en/common.json", {"auth": {"login": "Log in", "logout": "Log out"}})
+    save_json(f"{locales}/fr/common.json", {"auth": {"login": "Connexion"}})
+    save_json(f"{locales}/en/demo.json", {"title": "Demo"})
+    store = LocaleStore(locales)
+
+    streamed = list(audit_rows(store, ["en", "fr"], ["common", "demo"], stream=True))
+    assert store._data == {}
+    assert streamed == list(audit_rows(LocaleStore(locales), ["en", "fr"], ["common", "demo"]))
+    assert streamed == [
+        ("common", "auth.login", ["Log in", "Connexion"]),
+        ("common", "auth.logout", ["Log out", None]),
+        ("demo", "title", ["Demo", None]),
+    ]
+    assert list(stream_rows(store, ["en"], "demo")) == [("title", ["Demo"])]
+
+
+def test_stream_rows_read_runs_spanning_several_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_translation_audit, "RUN_BLOCK", 2)
+    locales = str(tmp_path)
+    en = {"a": {f"k{n}": f"v{n}" for n in range(5)}, "plans": {"features": ["x", "y"]}, "n": 3}
+    save_json(f"{locales}/en/common.json", en)
+    save_json(f"{locales}/fr/common.json", {"a": {"k3": "fr3"}, "z": True})
+    streamed = list(stream_rows(LocaleStore(locales), ["en", "fr"], "common"))
+    assert streamed == list(matrix_rows(LocaleStore(locales), ["en", "fr"], "common"))
+    assert ("plans.features", [["x", "y"], None]) in streamed
+    assert ("a.k3", ["v3", "fr3"]) in streamed
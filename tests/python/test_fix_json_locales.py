@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+from fix_json_locales import check_files, fix_json_file, locale_json_files, main
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_check_walks_nested_files_and_accepts_any_json_value(tmp_path, capsys):
+    root = str(tmp_path / "locales")
+    write(f"{root}/fr/common.json", '{"a": "b"}')
+    write(f"{root}/backup/fr/common.json", '["liste"]')
+    write(f"{root}/backup/fr/broken.json", '{"a": 1,}')
+    write(f"{root}/fr/notes.txt", "pas du JSON")
+
+    filepaths = locale_json_files(root)
+    assert filepaths == [
+        f"{root}/backup/fr/broken.json",
+        f"{root}/backup/fr/common.json",
+        f"{root}/fr/common.json",
+    ]
+    assert check_files(filepaths, None) == 1
+    assert "backup/fr/broken.json" in capsys.readouterr().out
+
+
+def run_check(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["fix_json_locales.py", "--check", "--no-cache"])
+    with pytest.raises(SystemExit) as exit:
+        main()
+    return exit.value.code
+
+
+# Les copies de backup/ ne sont pas corrigées par le mode correction : elles
+# sont signalées sans faire échouer --check
+def test_check_reports_broken_backup_without_failing(tmp_path, monkeypatch, capsys):
+    write(f"{tmp_path}/public/locales/fr/common.json", '{"a": "b"}')
+    write(f"{tmp_path}/public/locales/backup/fr/common.json", '{"a": 1,}')
+    assert run_check(monkeypatch, tmp_path) == 0
+    out = capsys.readouterr().out
+    assert "ERREUR JSON (non bloquante): public/locales/backup/fr/common.json" in out
+    assert "0 invalides, 1 invalides non bloquants" in out
+
+    write(f"{tmp_path}/public/locales/fr/demo.json", '{"a": 1,}')
+    assert run_check(monkeypatch, tmp_path) == 1
+
+
+def test_check_skips_files_validated_with_the_same_content(tmp_path, capsys):
+    root = str(tmp_path / "locales")
+    manifest = str(tmp_path / "validated.json")
+    write(f"{root}/fr/common.json", '{"a": "b"}')
+    filepaths = locale_json_files(root)
+
+    assert check_files(filepaths, manifest) == 0
+    assert check_files(filepaths, manifest) == 0
+    assert "1 inchangés" in capsys.readouterr().out.splitlines()[-1]
+
+    write(f"{root}/fr/common.json", '{"a": }')
+    assert check_files(filepaths, manifest) == 1
+
+
+def test_fix_writes_only_files_that_need_repairs(tmp_path):
+    valid = str(tmp_path / "fr" / "common.json")
+    broken = str(tmp_path / "fr" / "demo.json")
+    write(valid, '{"a": "b"}')
+    write(broken, '{a: "b",}')
+    mtime = os.stat(valid).st_mtime_ns
+
+    assert fix_json_file(valid) == "valid"
+    assert fix_json_file(broken) == "written"
+    assert os.stat(valid).st_mtime_ns == mtime
+    with open(broken, encoding="utf-8") as f:
+        assert f.read() == '{\n  "a": "b"\n}'
+    assert sorted(os.listdir(tmp_path / "fr")) == ["common.json", "demo.json"]
@@ -0,0 +1,35 @@
+from import_translation_audit import apply_patches, build_patches
+from locale_store import LocaleStore, save_json
+
+HEADER = ["key", "en", "fr"]
+
+
+def make_store(tmp_path):
+    save_json(f"{tmp_path}/en/translation.json", {"auth": {"login": "Log in"}})
+    save_json(f"{tmp_path}/fr/translation.json", {"auth": {"login": "Connexion"}})
+    return LocaleStore(str(tmp_path))
+
+
+def test_keys_with_an_empty_segment_are_rejected_even_with_force(tmp_path):
+    store = make_store(tmp_path)
+    rows = [HEADER, [".", "", "(valeur)"], ["auth..login", "", "x"], ["auth.login", "Log in", "Se connecter"]]
+    patches, conflicts, rejected = build_patches(rows, store, force=True)
+    assert rejected == [("fr", "translation", ".", "segment de clé vide"),
+                        ("fr", "translation", "auth..login", "segment de clé vide")]
+    assert conflicts == []
+    assert dict(patches) == {("fr", "translation"): {"auth.login": "Se connecter"}}
+
+    applied, misplaced = apply_patches(store, patches)
+    assert misplaced == []
+    assert store.get("fr", "translation") == {"auth": {"login": "Se connecter"}}
+
+
+def test_keys_absent_from_the_reference_are_conflicts(tmp_path):
+    store = make_store(tmp_path)
+    rows = [HEADER, ["auth.signup", "", "Inscription"]]
+    patches, conflicts, rejected = build_patches(rows, store)
+    assert conflicts == [("fr", "translation", "auth.signup", "clé absente de la référence en")]
+    assert not patches and not rejected
+
+    patches, _, _ = build_patches(rows, store, force=True)
+    assert dict(patches) == {("fr", "translation"): {"auth.signup": "Inscription"}}
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from locale_backup import BackupStore
+from locale_store import save_json
+
+
+def test_backup_and_restore_round_trip(tmp_path):
+    path = str(tmp_path / "fr" / "common.json")
+    save_json(path, {"auth": {"login": "Connexion"}})
+    store = BackupStore(str(tmp_path / "backups"), compression="gzip")
+    run = store.begin("test")
+    sha256 = run.add(path)
+    assert run.add(path) == sha256
+    assert store.put(open(path, "rb").read()) == (sha256, False)
+
+    save_json(path, {"auth": {"login": "Se connecter"}})
+    assert store.restore(run.run_id) == [os.path.normpath(path)]
+    assert store.restore(run.run_id) == []
+    with open(path, encoding="utf-8") as f:
+        assert "Connexion" in f.read()
+    assert store.manifest(run.run_id)["files"] == {os.path.normpath(path): sha256}
+    leftovers = [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".tmp")]
+    assert leftovers == []
+
+
+def test_gc_keeps_everything_when_a_manifest_is_unreadable(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"), compression="gzip")
+    old, new = store.begin("old"), store.begin("new")
+    new.run_id = old.run_id + "-new"
+    old.add(str(tmp_path / "a.json"), '{"a": 1}')
+    new.add(str(tmp_path / "b.json"), '{"b": 2}')
+    with open(store.run_path(new.run_id), "w", encoding="utf-8") as f:
+        f.write("{tronqué")
+
+    with pytest.raises(SystemExit):
+        store.gc(keep=0)
+    assert os.path.exists(store.run_path(old.run_id))
+    assert sum(len(names) for _, _, names in os.walk(tmp_path / "backups" / "objects")) == 2
+
+
+def test_gc_leaves_temporary_files_of_a_running_backup(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"), compression="gzip")
+    run = store.begin("old")
+    run.add(str(tmp_path / "a.json"), '{"a": 1}')
+    in_flight = store.object_path("f" * 64, "gzip") + ".1234.tmp"
+    os.makedirs(os.path.dirname(in_flight))
+    open(in_flight, "wb").close()
+
+    assert store.gc(keep=0) == (1, 1)
+    assert os.path.exists(in_flight)
@@ -0,0 +1,58 @@
+import os
+
+from locale_pack import LocalePack, build_pack, load_pack_if_fresh
+from locale_store import LocaleStore, save_json
+
+
+def make_locales(tmp_path):
+    locales = tmp_path / "locales"
+    save_json(str(locales / "en" / "common.json"), {"auth": {"login": "Log in"}, "plans": {"features": ["a", "b"]}})
+    save_json(str(locales / "fr" / "common.json"), {"auth": {"login": "Connexion"}})
+    save_json(str(locales / "fr" / "demo.json"), {"title": "Démo"})
+    return str(locales), str(tmp_path / "locales.locpack")
+
+
+def test_pack_values_match_the_json_files(tmp_path):
+    locales, pack_path = make_locales(tmp_path)
+    build_pack(locales, pack_path)
+    pack = LocalePack(pack_path)
+    try:
+        assert pack.languages == ["en", "fr"]
+        assert pack.get("fr", "common", "auth.login") == "Connexion"
+        assert pack.get("en", "common", "plans.features") == ["a", "b"]
+        assert pack.get("fr", "common", "plans.features") is None
+        assert dict(pack.items("en", "common")) == {"auth.login": "Log in", "plans.features": ["a", "b"]}
+        assert pack.has("fr", "demo") and not pack.has("en", "demo")
+    finally:
+        pack.close()
+
+
+def test_pack_is_stale_after_a_backdated_edit(tmp_path):
+    locales, pack_path = make_locales(tmp_path)
+    build_pack(locales, pack_path)
+    file_path = os.path.join(locales, "fr", "common.json")
+    stat = os.stat(file_path)
+    save_json(file_path, {"auth": {"login": "Se connecter"}})
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert load_pack_if_fresh(locales, pack_path) is None
+    store = LocaleStore(locales)
+    assert not store.use_pack(pack_path)
+    assert store.flat("fr")["auth.login"] == "Se connecter"
+
+
+def test_pack_is_stale_after_a_deleted_file(tmp_path):
+    locales, pack_path = make_locales(tmp_path)
+    build_pack(locales, pack_path)
+    os.remove(os.path.join(locales, "fr", "demo.json"))
+    assert load_pack_if_fresh(locales, pack_path) is None
+
+
+def test_store_reads_flat_views_from_a_fresh_pack(tmp_path):
+    locales, pack_path = make_locales(tmp_path)
+    build_pack(locales, pack_path)
+    store = LocaleStore(locales)
+    assert store.use_pack(pack_path)
+    assert store.packed("fr") and not store.packed("en", "demo")
+    assert store.flat("fr") == {"auth.login": "Connexion"}
+    store.pack.close()
@@ -0,0 +1,10 @@
+import locale_store
+
+
+def test_get_store_applies_quiet_on_every_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(locale_store, "_stores", {})
+    quiet = locale_store.get_store(str(tmp_path), quiet=True)
+    verbose = locale_store.get_store(str(tmp_path))
+    assert verbose is quiet
+    assert not verbose.quiet
+    assert locale_store.get_store(str(tmp_path), quiet=True).quiet
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from relaxed_json import RelaxedJSONError, loads_relaxed, parse_relaxed
+
+
+# Les deux modes (analyseur C par conteneur, ou tout en Python) doivent
+# donner le même résultat et les mêmes corrections
+def parse_both(text):
+    targeted = parse_relaxed(text)
+    assert parse_relaxed(text, targeted=False) == targeted
+    return targeted
+
+
+def messages(repairs):
+    return [message for _, _, message in repairs]
+
+
+def test_valid_document_has_no_repairs():
+    text = '{"a": "b", "n": {"x": [1, 2.5, true, null]}}'
+    assert parse_both(text) == (json.loads(text), [])
+    assert loads_relaxed(text) == (json.loads(text), [])
+
+
+def test_invalid_escape_keeps_backslash_and_following_members():
+    value, repairs = parse_both('{"a": "x\\qy", "b": "c", "d": {"e": 1}}')
+    assert value == {"a": "x\\qy", "b": "c", "d": {"e": 1}}
+    assert repairs == [(1, 9, "échappement invalide conservé tel quel")]
+
+
+def test_invalid_unicode_escape_keeps_valid_escapes():
+    value, repairs = parse_both('{"a": "\\n\\u12zz", "b": "\\u00e9"}')
+    assert value == {"a": "\n\\u12zz", "b": "é"}
+    assert messages(repairs) == ["échappement invalide conservé tel quel"]
+
+
+def test_unterminated_string_stops_at_end_of_line():
+    value, repairs = parse_both('{\n  "a": "abc,\n  "b": "c"\n}')
+    assert value == {"a": "abc", "b": "c"}
+    assert repairs[0] == (2, 8, "guillemet fermant manquant ajouté")
+
+
+def test_trailing_commas_are_removed():
+    value, repairs = parse_both('{"a": [1, 2,], "b": {"c": 1,},}')
+    assert value == {"a": [1, 2], "b": {"c": 1}}
+    assert messages(repairs) == ["virgule finale supprimée"] * 3
+
+
+def test_missing_commas_are_added():
+    value, repairs = parse_both('{\n  "a": "b"\n  "c": [1 2]\n}')
+    assert value == {"a": "b", "c": [1, 2]}
+    assert messages(repairs) == ["virgule manquante ajoutée"] * 2
+    assert repairs[0][:2] == (3, 3)
+
+
+def test_control_character_is_kept_in_string():
+    value, repairs = parse_both('{"a": "x\ty", "b": 1}')
+    assert value == {"a": "x\ty", "b": 1}
+    assert repairs == [(1, 9, "caractère de contrôle dans une chaîne")]
+
+
+def test_unquoted_keys_values_and_comments():
+    value, repairs = parse_both("{\n  // commentaire\n  a: Bonjour le monde,\n  'b': True\n}")
+    assert value == {"a": "Bonjour le monde", "b": True}
+    assert messages(repairs) == [
+        "commentaire supprimé",
+        "guillemets ajoutés à la clé",
+        "guillemets ajoutés à la valeur",
+        "apostrophes remplacées par des guillemets",
+        "True remplacé par true",
+    ]
+
+
+def test_unclosed_containers_are_closed():
+    value, repairs = parse_both('{"a": {"b": [1, 2')
+    assert value == {"a": {"b": [1, 2]}}
+    assert messages(repairs) == [
+        "crochet fermant manquant ajouté",
+        "accolade fermante manquante ajoutée",
+        "accolade fermante manquante ajoutée",
+    ]
+
+
+def test_nan_is_not_accepted_as_a_number():
+    value, repairs = parse_both('{"a": NaN}')
+    assert value == {"a": "NaN"}
+    assert messages(repairs) == ["guillemets ajoutés à la valeur"]
+
+
+def test_empty_document_raises():
+    with pytest.raises(RelaxedJSONError):
+        parse_relaxed("  \n ")
+
+
+def test_bom_is_removed_with_a_repair():
+    value, repairs = parse_both('﻿{"a": 1}')
+    assert value == {"a": 1}
+    assert repairs == [(1, 1, "BOM supprimé")]
+    assert loads_relaxed('﻿{"a": 1}') == ({"a": 1}, [(1, 1, "BOM supprimé")])
+
+
+# Un ':' dans un tableau ne doit jamais bloquer l'analyse
+def test_stray_colon_in_array_is_removed():
+    value, repairs = parse_both('[1, :2]')
+    assert value == [1, 2]
+    assert messages(repairs) == ["':' inattendu supprimé"]
+
+
+def test_object_member_in_array_becomes_two_items():
+    value, repairs = parse_both('{"a": ["x": "y"]}')
+    assert value == {"a": ["x", "y"]}
+    assert messages(repairs) == ["':' remplacé par ','"]
+
+
+def test_array_missing_its_bracket_before_next_member():
+    value, repairs = parse_both('{"a": ["x", "y",\n"f": true}')
+    assert value == {"a": ["x", "y", "f", True]}
+    assert messages(repairs) == ["':' remplacé par ','", "'}' remplacé par ']'",
+                                 "accolade fermante manquante ajoutée"]
@@ -0,0 +1,15 @@
+from verify_translations import ImprovementsRule, verify_language
+
+LITERAL = "Votre mot de passe a été modifié avec succès"
+
+
+def test_improvements_are_found_for_keys_missing_from_the_reference():
+    translation = {"auth": {"passwordChanged": LITERAL, "verificationSent": "Autre"}}
+    findings = verify_language("fr", {}, translation, [ImprovementsRule()])
+    assert [path for path, *_ in findings["improvements"]] == ["auth.passwordChanged"]
+
+
+def test_improvements_only_apply_to_common():
+    translation = {"auth": {"passwordChanged": LITERAL}}
+    assert verify_language("fr", translation, translation, [ImprovementsRule()], ns="demo") == {"improvements": []}
+    assert verify_language("fr", {}, {"auth": "texte"}, [ImprovementsRule()]) == {"improvements": []}
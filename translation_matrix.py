@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+from bisect import bisect_left
+
+from locale_store import LANGUAGES
+
+# Positions des bits à 1 pour chaque valeur d'octet (parcours des bitmaps)
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+# Matrice colonnaire clé x langue : un tableau trié de clés, une colonne de
+# valeurs par langue (None pour une cellule absente) et, par langue, un
+# bitmap de présence stocké dans un entier Python. Les comparaisons entre
+# langues (clés manquantes, couverture, unions...) sont des opérations
+# binaires sur ces entiers, exécutées en une fois sur toute la colonne.
+class TranslationMatrix:
+    def __init__(self, keys, columns, masks):
+        self.keys = keys
+        self.columns = columns
+        self.masks = masks
+
+    # Construire la matrice à partir de vues aplaties {langue: {clé: valeur}}
+    @classmethod
+    def from_flat(cls, flat_by_lang):
+        all_keys = set()
+        for flat in flat_by_lang.values():
+            all_keys.update(flat)
+        keys = sorted(all_keys)
+        columns = {}
+        masks = {}
+        for lang, flat in flat_by_lang.items():
+            column = [flat.get(key) for key in keys]
+            bits = bytearray((len(keys) + 7) // 8)
+            for i, key in enumerate(keys):
+                if key in flat:
+                    bits[i >> 3] |= 1 << (i & 7)
+            columns[lang] = column
+            masks[lang] = int.from_bytes(bits, 'little')
+        return cls(keys, columns, masks)
+
+    # Construire la matrice d'un namespace à partir d'un LocaleStore
+    # (lue directement dans l'instantané .locpack s'il est à jour)
+    @classmethod
+    def from_store(cls, store, languages=LANGUAGES, ns="common"):
+        if all(store.packed(lang, ns) for lang in languages):
+            return cls.from_pack(store.pack, languages, ns)
+        return cls.from_flat({lang: store.flat(lang, ns) for lang in languages})
+
+    # Construire la matrice à partir d'un instantané LocalePack : les clés y
+    # sont déjà triées et chaque valeur distincte n'est décodée qu'une fois
+    @classmethod
+    def from_pack(cls, pack, languages=LANGUAGES, ns="common"):
+        from locale_pack import MISSING
+        ids = [pack.value_ids(lang, ns).tolist() for lang in languages]
+        keys = pack.keys(ns)
+        # Ne garder que les clés présentes dans au moins une des langues
+        # (toujours le cas si toutes les langues de l'instantané sont demandées)
+        if not set(pack.languages) <= set(languages):
+            rows = [i for i, row in enumerate(zip(*ids)) if min(row) != MISSING]
+            keys = [keys[i] for i in rows]
+            ids = [[lang_ids[i] for i in rows] for lang_ids in ids]
+        unique_ids = list(set().union(*ids))
+        decoded = dict(zip(unique_ids, pack.values(unique_ids)))
+        columns = {}
+        masks = {}
+        for lang, lang_ids in zip(languages, ids):
+            bits = bytearray((len(keys) + 7) // 8)
+            for i, value_id in enumerate(lang_ids):
+                if value_id != MISSING:
+                    bits[i >> 3] |= 1 << (i & 7)
+            columns[lang] = list(map(decoded.__getitem__, lang_ids))
+            masks[lang] = int.from_bytes(bits, 'little')
+        return cls(keys, columns, masks)
+
+    @property
+    def languages(self):
+        return list(self.columns)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def index_of(self, key):
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return -1
+
+    # Ligne : valeurs d'une clé dans toutes les langues (None si absente)
+    def row(self, key):
+        i = self.index_of(key)
+        if i < 0:
+            return {lang: None for lang in self.columns}
+        return {lang: column[i] for lang, column in self.columns.items()}
+
+    def get(self, lang, key, default=None):
+        i = self.index_of(key)
+        if i < 0 or not self.masks[lang] >> i & 1:
+            return default
+        return self.columns[lang][i]
+
+    # Colonne : toutes les valeurs d'une langue, alignées sur self.keys
+    def column(self, lang):
+        return self.columns[lang]
+
+    # Itérer sur les (clé, valeur) présentes d'une langue
+    def items(self, lang):
+        column = self.columns[lang]
+        for i in self.indices(self.masks[lang]):
+            yield self.keys[i], column[i]
+
+    # Indices des bits à 1 d'un bitmap, dans l'ordre des clés
+    def indices(self, mask):
+        data = mask.to_bytes((len(self.keys) + 7) // 8, 'little')
+        for byte_index, byte in enumerate(data):
+            if byte:
+                base = byte_index << 3
+                for bit in _BYTE_BITS[byte]:
+                    yield base + bit
+
+    def keys_of(self, mask):
+        return [self.keys[i] for i in self.indices(mask)]
+
+    # Opérations ensemblistes entre langues (résultats triés)
+    def difference(self, lang, other):
+        return self.keys_of(self.masks[lang] & ~self.masks[other])
+
+    def intersection(self, *langs):
+        if not langs:
+            return list(self.keys)
+        mask = -1
+        for lang in langs:
+            mask &= self.masks[lang]
+        return self.keys_of(mask)
+
+    def union(self, *langs):
+        mask = 0
+        for lang in langs:
+            mask |= self.masks[lang]
+        return self.keys_of(mask)
+
+    # Clés de la référence absentes de la langue
+    def missing(self, lang, reference="en"):
+        return self.difference(reference, lang)
+
+    def count(self, lang):
+        return bin(self.masks[lang]).count('1')
+
+    # Couverture d'une langue par rapport à la référence : (présentes, total)
+    def coverage(self, lang, reference="en"):
+        ref_mask = self.masks[reference]
+        return bin(ref_mask & self.masks[lang]).count('1'), bin(ref_mask).count('1')
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import json
+import os
+import sqlite3
+
+from i18n_config import CACHE_DIR
+
+# Emplacement par défaut du cache des clés extraites (ignoré par git)
+USAGE_CACHE_PATH = os.path.join(CACHE_DIR, "usage.sqlite")
+
+# Cache persistant des clés extraites de chaque fichier source.
+# Un fichier dont le chemin, la date de modification et la taille n'ont pas
+# changé n'est même pas relu ; s'il a été touché sans changer de contenu,
+# l'empreinte sha256 permet de réutiliser les clés déjà extraites.
+class UsageCache:
+    def __init__(self, db_path=USAGE_CACHE_PATH, version=""):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT
+            );
+            CREATE TABLE IF NOT EXISTS blobs (sha256 TEXT PRIMARY KEY, keys TEXT);
+        """)
+        # Les résultats d'une autre version de l'extracteur ne sont pas fiables
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if row is None or row[0] != version:
+            self.conn.executescript("DELETE FROM files; DELETE FROM blobs;")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+            self.conn.commit()
+        self._files = {
+            path: (mtime_ns, size, sha256)
+            for path, mtime_ns, size, sha256 in self.conn.execute("SELECT * FROM files")
+        }
+        self._blobs = {}
+        self.hits = 0
+        self.misses = 0
+
+    # Clés en cache si le fichier n'a pas changé (même chemin, mtime et taille)
+    def lookup(self, path, stat):
+        entry = self._files.get(path)
+        if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            return None
+        keys = self.lookup_blob(entry[2])
+        if keys is not None:
+            self.hits += 1
+        return keys
+
+    # Clés en cache pour un contenu donné (identifié par son empreinte)
+    def lookup_blob(self, sha256):
+        if sha256 not in self._blobs:
+            row = self.conn.execute("SELECT keys FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is None:
+                return None
+            self._blobs[sha256] = json.loads(row[0])
+        return self._blobs[sha256]
+
+    # Enregistrer le résultat de l'extraction d'un fichier
+    def store(self, path, stat, sha256, keys):
+        self.misses += 1
+        keys = sorted(set(keys))
+        self._files[path] = (stat.st_mtime_ns, stat.st_size, sha256)
+        self._blobs[sha256] = keys
+        self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                          (path, stat.st_mtime_ns, stat.st_size, sha256))
+        self.conn.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?)",
+                          (sha256, json.dumps(keys, ensure_ascii=False)))
+
+    # Oublier les fichiers disparus sous un répertoire analysé
+    def prune(self, root, keep_paths):
+        prefix = root.rstrip("/") + "/"
+        stale = [path for path in self._files if path.startswith(prefix) and path not in keep_paths]
+        for path in stale:
+            del self._files[path]
+        self.conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in stale])
+        self.conn.execute("DELETE FROM blobs WHERE sha256 NOT IN (SELECT sha256 FROM files)")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
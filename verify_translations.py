@@ -1,217 +1,340 @@
 #!/usr/bin/env python3
-import json
+import argparse
+import operator
 import os
 import difflib
 import re
+from concurrent.futures import ProcessPoolExecutor
 
-# Définition des chemins
-LOCALES_DIR = "public/locales"
-LANGUAGES = ["en", "fr", "de", "es", "it"]
+try:
+    import numpy as np
+except ImportError:
+    # NumPy est optionnel : sans lui, les règles restent en Python pur
+    np = None
 
-# Fonction pour charger un fichier JSON
-def load_json(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Erreur lors du chargement de {file_path}: {e}")
-        return {}
+from locale_store import LOCALES_DIR, LANGUAGES, get_store
+from translation_matrix import TranslationMatrix
+
+# Tous les fichiers sont lus une seule fois via le magasin partagé
+store = get_store(LOCALES_DIR)
+
+# Mots qui doivent être identiques dans toutes les langues
+PRESERVED_WORDS = ["email", "LinkedIn", "Google"]
+PRESERVED_PATTERNS = [(word, re.compile(re.escape(word))) for word in PRESERVED_WORDS]
+
+# Expressions régulières pour les motifs de formatage
+FORMAT_PATTERNS = [re.compile(p) for p in [
+    r'%\w',  # formats style C (%s, %d, etc.)
+    r'\{\w+\}', # formats style template (ex: {name})
+    r'\$\{\w+\}', # formats style template ES6 (ex: ${name})
+    r'#\{\w+\}' # formats style Ruby (ex: #{name})
+]]
+
+# Suggestions basées sur des erreurs courantes de traduction
+COMMON_ERRORS = {
+    "fr": {
+        "auth.passwordChanged": (
+            "Your password has been changed successfully",
+            "Votre mot de passe a été modifié avec succès",
+            "Votre mot de passe a été changé avec succès",
+            "trop littéral: 'changé' au lieu de 'modifié'"
+        ),
+        "auth.verificationSent": (
+            "Verification email has been sent",
+            "L'email de vérification a été envoyé",
+            "Un email de vérification a été envoyé",
+            "article indéfini plus naturel"
+        )
+    },
+    "de": {
+        "forms.fieldRequired": (
+            "This field is required",
+            "Dieses Feld ist erforderlich",
+            "Pflichtfeld",
+            "plus concis et idiomatique"
+        )
+    },
+    "es": {
+        "search.noResults": (
+            "No results found",
+            "No se encontraron resultados",
+            "Sin resultados",
+            "plus concis pour l'interface utilisateur"
+        )
+    },
+    "it": {
+        "dashboard.welcome": (
+            "Welcome back",
+            "Bentornato",
+            "Bentornato/a",
+            "ajouter une forme inclusive"
+        )
+    }
+}
+
+# Règle de vérification : reçoit les clés absentes et les paires de valeurs
+# (référence, traduction) rencontrées pendant l'unique parcours de l'arbre.
+# Une règle « en bloc » (bulk) reçoit à la place, après le parcours, la
+# liste de toutes les paires de chaînes (chemin, référence, traduction).
+# finish() reçoit enfin la traduction complète, pour les règles qui ne
+# dépendent pas de la référence.
+class Rule:
+    name = ""
+    bulk = False
+
+    def on_missing(self, lang, path):
+        return []
+
+    def on_leaf(self, lang, path, ref, trans):
+        return []
+
+    def on_pairs(self, lang, pairs):
+        return []
+
+    def finish(self, lang, ns, translation):
+        return []
 
 # 1. Vérifier que toutes les clés existent dans toutes les langues
-def check_missing_keys():
-    reference = load_json(f"{LOCALES_DIR}/en/common.json")
-    missing_keys = {}
-    
-    for lang in LANGUAGES:
-        if lang == "en":
-            continue
-            
-        translation = load_json(f"{LOCALES_DIR}/{lang}/common.json")
-        missing = []
-        
-        def check_nested(ref, trans, path=""):
-            for key in ref:
-                current_path = f"{path}.{key}" if path else key
-                if key not in trans:
-                    missing.append(current_path)
-                elif isinstance(ref[key], dict) and isinstance(trans[key], dict):
-                    check_nested(ref[key], trans[key], current_path)
-        
-        check_nested(reference, translation)
-        
-        if missing:
-            missing_keys[lang] = missing
-    
-    return missing_keys
+class MissingKeysRule(Rule):
+    name = "missing"
+
+    def on_missing(self, lang, path):
+        return [path]
 
 # 2. Vérifier les valeurs qui pourraient être des erreurs de traduction
-def check_suspect_translations():
-    reference = load_json(f"{LOCALES_DIR}/en/common.json")
-    suspect_translations = {}
-    
-    # Mots qui doivent être identiques dans toutes les langues
-    preserved_words = ["email", "LinkedIn", "Google"]
-    
-    for lang in LANGUAGES:
-        if lang == "en":
-            continue
-            
-        translation = load_json(f"{LOCALES_DIR}/{lang}/common.json")
+class SuspectTranslationsRule(Rule):
+    name = "suspects"
+
+    def on_leaf(self, lang, path, ref, trans):
+        if not (isinstance(ref, str) and isinstance(trans, str)):
+            return []
         suspects = []
+        # Vérifier les mots qui doivent être identiques
+        for word in PRESERVED_WORDS:
+            if word in ref and word not in trans:
+                suspects.append((path, "Mot préservé manquant", ref, trans))
         
-        def check_nested_values(ref, trans, path=""):
-            for key in ref:
-                if key not in trans:
-                    continue
-                    
-                current_path = f"{path}.{key}" if path else key
-                
-                if isinstance(ref[key], dict) and isinstance(trans[key], dict):
-                    check_nested_values(ref[key], trans[key], current_path)
-                elif isinstance(ref[key], str) and isinstance(trans[key], str):
-                    # Vérifier les mots qui doivent être identiques
-                    for word in preserved_words:
-                        if word in ref[key] and word not in trans[key]:
-                            suspects.append((current_path, "Mot préservé manquant", ref[key], trans[key]))
-                    
-                    # Vérifier les valeurs qui pourraient être des placeholders non traduits
-                    if ref[key] == trans[key] and not any(word in ref[key] for word in preserved_words) and len(ref[key]) > 3:
-                        # Ignorer les valeurs courtes qui pourraient être identiques (ex: "OK")
-                        suspects.append((current_path, "Valeur potentiellement non traduite", ref[key], trans[key]))
-                    
-                    # Vérifier les différences de longueur importantes
-                    if len(trans[key]) < len(ref[key]) * 0.5 or len(trans[key]) > len(ref[key]) * 2:
-                        suspects.append((current_path, "Différence de longueur importante", ref[key], trans[key]))
-        
-        check_nested_values(reference, translation)
+        # Vérifier les valeurs qui pourraient être des placeholders non traduits
+        if ref == trans and not any(word in ref for word in PRESERVED_WORDS) and len(ref) > 3:
+            # Ignorer les valeurs courtes qui pourraient être identiques (ex: "OK")
+            suspects.append((path, "Valeur potentiellement non traduite", ref, trans))
         
-        if suspects:
-            suspect_translations[lang] = suspects
-    
-    return suspect_translations
+        # Vérifier les différences de longueur importantes
+        if len(trans) < len(ref) * 0.5 or len(trans) > len(ref) * 2:
+            suspects.append((path, "Différence de longueur importante", ref, trans))
+        return suspects
 
-# 3. Vérifier les problèmes de formatage
-def check_formatting_issues():
-    reference = load_json(f"{LOCALES_DIR}/en/common.json")
-    formatting_issues = {}
-    
-    # Expressions régulières pour les motifs de formatage
-    format_patterns = [
-        r'%\w',  # formats style C (%s, %d, etc.)
-        r'\{\w+\}', # formats style template (ex: {name})
-        r'\$\{\w+\}', # formats style template ES6 (ex: ${name})
-        r'#\{\w+\}' # formats style Ruby (ex: #{name})
-    ]
-    
-    for lang in LANGUAGES:
-        if lang == "en":
-            continue
-            
-        translation = load_json(f"{LOCALES_DIR}/{lang}/common.json")
-        issues = []
+    # Avec NumPy, les seuils de longueur et l'identité des valeurs sont
+    # évalués sur des tableaux pour toutes les paires de la langue à la fois
+    @property
+    def bulk(self):
+        return np is not None
+
+    def on_pairs(self, lang, pairs):
+        count = len(pairs)
+        if not count:
+            return []
+        refs = list(map(operator.itemgetter(1), pairs))
+        transs = list(map(operator.itemgetter(2), pairs))
+        ref_len = np.fromiter(map(len, refs), dtype=np.int64, count=count)
+        trans_len = np.fromiter(map(len, transs), dtype=np.int64, count=count)
+        length_issue = (trans_len < ref_len * 0.5) | (trans_len > ref_len * 2)
+        identical = np.fromiter(map(operator.eq, refs, transs), dtype=bool, count=count)
         
-        def check_nested_formats(ref, trans, path=""):
-            for key in ref:
-                if key not in trans:
-                    continue
-                    
-                current_path = f"{path}.{key}" if path else key
-                
-                if isinstance(ref[key], dict) and isinstance(trans[key], dict):
-                    check_nested_formats(ref[key], trans[key], current_path)
-                elif isinstance(ref[key], str) and isinstance(trans[key], str):
-                    # Vérifier chaque motif de formatage
-                    for pattern in format_patterns:
-                        ref_formats = re.findall(pattern, ref[key])
-                        trans_formats = re.findall(pattern, trans[key])
-                        
-                        if ref_formats != trans_formats:
-                            issues.append((current_path, "Motifs de formatage différents", ref[key], trans[key]))
-                            break
+        # Mots préservés : une recherche par mot sur toutes les références
+        # concaténées ; les positions trouvées sont ramenées aux indices des
+        # paires, et seules ces paires sont vérifiées côté traduction
+        ref_starts = np.zeros(count, dtype=np.int64)
+        np.cumsum(ref_len[:-1] + 1, out=ref_starts[1:])
+        joined = "\x00".join(refs)
+        has_preserved = np.zeros(count, dtype=bool)
+        preserved_missing = {word: np.zeros(count, dtype=bool) for word in PRESERVED_WORDS}
+        for word, pattern in PRESERVED_PATTERNS:
+            positions = [match.start() for match in pattern.finditer(joined)]
+            if not positions:
+                continue
+            owners = np.searchsorted(ref_starts, positions, side='right') - 1
+            has_preserved[owners] = True
+            for i in owners.tolist():
+                if word not in transs[i]:
+                    preserved_missing[word][i] = True
+        preserved_missing = [preserved_missing[word] for word in PRESERVED_WORDS]
+        untranslated = identical & ~has_preserved & (ref_len > 3)
         
-        check_nested_formats(reference, translation)
+        flagged = length_issue | untranslated
+        for missing in preserved_missing:
+            flagged |= missing
         
-        if issues:
-            formatting_issues[lang] = issues
-    
-    return formatting_issues
+        # Construire les résultats dans le même ordre que la version Python
+        indices = np.flatnonzero(flagged)
+        missing_rows = [missing[indices].tolist() for missing in preserved_missing]
+        suspects = []
+        for n, (i, is_untranslated, is_length_issue) in enumerate(zip(
+                indices.tolist(), untranslated[indices].tolist(), length_issue[indices].tolist())):
+            path, ref, trans = pairs[i]
+            for row in missing_rows:
+                if row[n]:
+                    suspects.append((path, "Mot préservé manquant", ref, trans))
+            if is_untranslated:
+                suspects.append((path, "Valeur potentiellement non traduite", ref, trans))
+            if is_length_issue:
+                suspects.append((path, "Différence de longueur importante", ref, trans))
+        return suspects
 
-# 4. Suggérer des améliorations pour les traductions trop littérales
-def suggest_improvements():
-    # Suggestions basées sur des erreurs courantes de traduction
-    common_errors = {
-        "fr": {
-            "auth.passwordChanged": (
-                "Your password has been changed successfully",
-                "Votre mot de passe a été modifié avec succès",
-                "Votre mot de passe a été changé avec succès",
-                "trop littéral: 'changé' au lieu de 'modifié'"
-            ),
-            "auth.verificationSent": (
-                "Verification email has been sent",
-                "L'email de vérification a été envoyé",
-                "Un email de vérification a été envoyé",
-                "article indéfini plus naturel"
-            )
-        },
-        "de": {
-            "forms.fieldRequired": (
-                "This field is required",
-                "Dieses Feld ist erforderlich",
-                "Pflichtfeld",
-                "plus concis et idiomatique"
-            )
-        },
-        "es": {
-            "search.noResults": (
-                "No results found",
-                "No se encontraron resultados",
-                "Sin resultados",
-                "plus concis pour l'interface utilisateur"
-            )
-        },
-        "it": {
-            "dashboard.welcome": (
-                "Welcome back",
-                "Bentornato",
-                "Bentornato/a",
-                "ajouter une forme inclusive"
-            )
-        }
-    }
+# 3. Vérifier les problèmes de formatage
+class FormattingIssuesRule(Rule):
+    name = "formatting"
+
+    def on_leaf(self, lang, path, ref, trans):
+        if not (isinstance(ref, str) and isinstance(trans, str)):
+            return []
+        # Vérifier chaque motif de formatage
+        for pattern in FORMAT_PATTERNS:
+            if pattern.findall(ref) != pattern.findall(trans):
+                return [(path, "Motifs de formatage différents", ref, trans)]
+        return []
+
+# 4. Suggérer des améliorations pour les traductions trop littérales.
+# Chaque chemin est cherché directement dans la traduction de common.json,
+# qu'il existe ou non dans la référence anglaise.
+class ImprovementsRule(Rule):
+    name = "improvements"
+
+    def finish(self, lang, ns, translation):
+        if ns != "common":
+            return []
+        improvements = []
+        for path, (en_value, current, suggested, reason) in COMMON_ERRORS.get(lang, {}).items():
+            node = translation
+            for part in path.split('.'):
+                if not isinstance(node, dict) or part not in node:
+                    break
+                node = node[part]
+            else:
+                if node == current:
+                    improvements.append((path, en_value, current, suggested, reason))
+        return improvements
+
+DEFAULT_RULES = [
+    MissingKeysRule(),
+    SuspectTranslationsRule(),
+    FormattingIssuesRule(),
+    ImprovementsRule(),
+]
+
+# Parcours unique : chaque paire (référence, traduction) est visitée une
+# seule fois et transmise à toutes les règles. Les paires de chaînes sont
+# aussi collectées dans pairs pour les règles en bloc.
+def walk_pairs(lang, reference, translation, rules, findings, path="", prefix="", pairs=None):
+    for key in reference:
+        current_path = f"{path}.{key}" if path else f"{prefix}{key}"
+        ref_value = reference[key]
+        if key not in translation:
+            for rule in rules:
+                findings[rule.name].extend(rule.on_missing(lang, current_path))
+            continue
+        trans_value = translation[key]
+        if isinstance(ref_value, dict) and isinstance(trans_value, dict):
+            walk_pairs(lang, ref_value, trans_value, rules, findings, current_path, pairs=pairs)
+        else:
+            for rule in rules:
+                findings[rule.name].extend(rule.on_leaf(lang, current_path, ref_value, trans_value))
+            if pairs is not None and isinstance(ref_value, str) and isinstance(trans_value, str):
+                pairs.append((current_path, ref_value, trans_value))
+
+# Vérifier une langue avec toutes les règles en un seul passage
+def verify_language(lang, reference, translation, rules=None, prefix="", ns="common"):
+    rules = DEFAULT_RULES if rules is None else rules
+    findings = {rule.name: [] for rule in rules}
+    walk_rules = [rule for rule in rules if not rule.bulk]
+    bulk_rules = [rule for rule in rules if rule.bulk]
+    pairs = [] if bulk_rules else None
+    walk_pairs(lang, reference, translation, walk_rules, findings, prefix=prefix, pairs=pairs)
+    for rule in bulk_rules:
+        findings[rule.name].extend(rule.on_pairs(lang, pairs))
+    for rule in rules:
+        findings[rule.name].extend(rule.finish(lang, ns, translation))
+    return findings
+
+# État des processus de travail : la référence anglaise et les règles ne
+# sont envoyées qu'une seule fois à chaque processus (initializer)
+_worker_references = {}
+_worker_rules = None
+
+def _init_worker(references, rules):
+    global _worker_references, _worker_rules
+    _worker_references = references
+    _worker_rules = rules
+
+def _verify_task(lang, ns, prefix):
+    translation = get_store(LOCALES_DIR).get(lang, ns)
+    return verify_language(lang, _worker_references[ns], translation, _worker_rules, prefix, ns)
+
+# Vérifier toutes les langues ; retourne {règle: {langue: résultats}}.
+# Avec jobs > 1, chaque couple (langue, namespace) est traité dans un
+# processus séparé ; les résultats sont fusionnés dans l'ordre du rapport.
+def run_checks(languages=LANGUAGES, ns="common", rules=None, jobs=1):
+    rules = DEFAULT_RULES if rules is None else rules
+    namespaces = [ns] if isinstance(ns, str) else list(ns)
+    # Préfixer les chemins par le namespace seulement s'il y en a plusieurs
+    multi = len(namespaces) > 1
+    references = {name: store.get("en", name) for name in namespaces}
+    tasks = [
+        (lang, name, f"{name}:" if multi else "")
+        for lang in languages if lang != "en"
+        for name in namespaces
+    ]
     
-    improvements = {}
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(references, rules)) as executor:
+            futures = [executor.submit(_verify_task, *task) for task in tasks]
+            all_findings = [future.result() for future in futures]
+    else:
+        all_findings = [
+            verify_language(lang, references[name], store.get(lang, name), rules, prefix, name)
+            for lang, name, prefix in tasks
+        ]
     
-    for lang, suggestions in common_errors.items():
-        improvements[lang] = []
-        translation = load_json(f"{LOCALES_DIR}/{lang}/common.json")
-        
-        for path, (en_value, current, suggested, reason) in suggestions.items():
-            # Obtenir la valeur actuelle dans la traduction
-            parts = path.split('.')
-            current_dict = translation
-            found = True
-            
-            for part in parts:
-                if part not in current_dict:
-                    found = False
-                    break
-                current_dict = current_dict[part]
-            
-            if found:
-                actual_current = current_dict
-                if actual_current == current:
-                    improvements[lang].append((path, en_value, current, suggested, reason))
+    results = {rule.name: {} for rule in rules}
+    for (lang, _, _), findings in zip(tasks, all_findings):
+        for name, items in findings.items():
+            if items:
+                results[name].setdefault(lang, []).extend(items)
     
-    return improvements
+    return results
+
+def check_missing_keys():
+    return run_checks(rules=[MissingKeysRule()])["missing"]
+
+def check_suspect_translations():
+    return run_checks(rules=[SuspectTranslationsRule()])["suspects"]
+
+def check_formatting_issues():
+    return run_checks(rules=[FormattingIssuesRule()])["formatting"]
+
+def suggest_improvements():
+    found = run_checks(rules=[ImprovementsRule()])["improvements"]
+    return {lang: found.get(lang, []) for lang in COMMON_ERRORS}
 
 # Programme principal
 def main():
+    parser = argparse.ArgumentParser(description="Vérification de la qualité des traductions")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="nombre de processus (0 = tous les cœurs)")
+    parser.add_argument("--ns", nargs="+", default=["common"],
+                        help="namespaces à vérifier (défaut: common)")
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    
     print("Vérification de la qualité des traductions\n")
     
+    # Un seul parcours par langue pour toutes les vérifications
+    results = run_checks(ns=args.ns, jobs=jobs)
+    
     # 1. Vérifier les clés manquantes
     print("=== VÉRIFICATION DES CLÉS MANQUANTES ===")
-    missing_keys = check_missing_keys()
+    missing_keys = results["missing"]
     if not missing_keys:
         print("Aucune clé manquante trouvée dans les traductions.")
     else:
@@ -225,7 +348,7 @@ def main():
     
     # 2. Vérifier les valeurs suspectes
     print("\n=== VÉRIFICATION DES TRADUCTIONS SUSPECTES ===")
-    suspect_translations = check_suspect_translations()
+    suspect_translations = results["suspects"]
     if not suspect_translations:
         print("Aucune traduction suspecte trouvée.")
     else:
@@ -241,7 +364,7 @@ def main():
     
     # 3. Vérifier les problèmes de formatage
     print("\n=== VÉRIFICATION DES PROBLÈMES DE FORMATAGE ===")
-    formatting_issues = check_formatting_issues()
+    formatting_issues = results["formatting"]
     if not formatting_issues:
         print("Aucun problème de formatage trouvé.")
     else:
@@ -257,7 +380,7 @@ def main():
     
     # 4. Suggestions d'amélioration
     print("\n=== SUGGESTIONS D'AMÉLIORATION ===")
-    improvements = suggest_improvements()
+    improvements = {lang: results["improvements"].get(lang, []) for lang in COMMON_ERRORS}
     has_improvements = False
     for lang, suggestions in improvements.items():
         if suggestions:
@@ -273,6 +396,19 @@ def main():
     if not has_improvements:
         print("Pas de suggestions d'amélioration pour le moment.")
     
+    # 5. Couverture des clés (opérations sur les colonnes de la matrice)
+    print("\n=== COUVERTURE DES TRADUCTIONS ===")
+    for name in args.ns:
+        matrix = TranslationMatrix.from_store(store, LANGUAGES, name)
+        print(f"\nNamespace: {name} ({matrix.count('en')} clés de référence)")
+        for lang in LANGUAGES:
+            if lang == "en":
+                continue
+            present, total = matrix.coverage(lang, "en")
+            extra = len(matrix.difference(lang, "en"))
+            percent = present / total * 100 if total else 100.0
+            print(f"  - {lang}: {present}/{total} ({percent:.1f}%), {extra} clés hors référence")
+    
     print("\nVérification terminée.")
 
 if __name__ == "__main__":